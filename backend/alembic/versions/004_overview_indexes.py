@@ -0,0 +1,32 @@
+"""Add indexes backing the analytics overview aggregates
+
+Revision ID: 004_overview_indexes
+Revises: 003_fix_app_settings_unique
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_overview_indexes"
+down_revision: Union[str, None] = "003_fix_app_settings_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_status_posted_at", "posts", ["status", "posted_at"], unique=False
+    )
+    op.create_index(
+        "ix_post_analytics_collected_at",
+        "post_analytics",
+        ["collected_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_analytics_collected_at", table_name="post_analytics")
+    op.drop_index("ix_posts_status_posted_at", table_name="posts")
@@ -0,0 +1,49 @@
+"""Index post_analytics for time-range scans and per-post history
+
+Revision ID: 005_post_analytics_time_indexes
+Revises: 004_overview_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_post_analytics_time_indexes"
+down_revision: Union[str, None] = "004_overview_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # post_analytics is append-only in collected_at order: on PostgreSQL a BRIN
+    # index serves the trend/overview range scans at a fraction of the B-tree size
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_post_analytics_collected_at", table_name="post_analytics")
+        op.create_index(
+            "ix_post_analytics_collected_at",
+            "post_analytics",
+            ["collected_at"],
+            unique=False,
+            postgresql_using="brin",
+        )
+    op.create_index(
+        "ix_post_analytics_post_id_collected_at",
+        "post_analytics",
+        ["post_id", "collected_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_post_analytics_post_id_collected_at", table_name="post_analytics"
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_post_analytics_collected_at", table_name="post_analytics")
+        op.create_index(
+            "ix_post_analytics_collected_at",
+            "post_analytics",
+            ["collected_at"],
+            unique=False,
+        )
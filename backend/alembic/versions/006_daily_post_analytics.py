@@ -0,0 +1,50 @@
+"""Add daily_post_analytics rollup backing the trends endpoint
+
+Revision ID: 006_daily_post_analytics
+Revises: 005_post_analytics_time_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "006_daily_post_analytics"
+down_revision: Union[str, None] = "005_post_analytics_time_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_post_analytics",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("impressions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("likes", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("retweets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("replies", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("posts_tracked", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "date", name="uq_daily_post_analytics_user_date"
+        ),
+    )
+
+    # Backfill from the existing snapshots
+    op.execute(
+        "INSERT INTO daily_post_analytics "
+        "(user_id, date, impressions, likes, retweets, replies, posts_tracked) "
+        "SELECT p.user_id, date(a.collected_at), "
+        "COALESCE(SUM(a.impressions), 0), COALESCE(SUM(a.likes), 0), "
+        "COALESCE(SUM(a.retweets), 0), COALESCE(SUM(a.replies), 0), COUNT(a.id) "
+        "FROM post_analytics a JOIN posts p ON p.id = a.post_id "
+        "GROUP BY p.user_id, date(a.collected_at)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_post_analytics")
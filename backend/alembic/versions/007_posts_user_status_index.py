@@ -0,0 +1,28 @@
+"""Add a per-user (user_id, status, posted_at) index on posts
+
+Revision ID: 007_posts_user_status_index
+Revises: 006_daily_post_analytics
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_posts_user_status_index"
+down_revision: Union[str, None] = "006_daily_post_analytics"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_user_status_posted_at",
+        "posts",
+        ["user_id", "status", "posted_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_user_status_posted_at", table_name="posts")
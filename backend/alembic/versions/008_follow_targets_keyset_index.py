@@ -0,0 +1,28 @@
+"""Index follow_targets for newest-first keyset pagination
+
+Revision ID: 008_follow_targets_keyset_index
+Revises: 007_posts_user_status_index
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008_follow_targets_keyset_index"
+down_revision: Union[str, None] = "007_posts_user_status_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_follow_targets_user_created_at",
+        "follow_targets",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_follow_targets_user_created_at", table_name="follow_targets")
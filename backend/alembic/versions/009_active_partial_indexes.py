@@ -0,0 +1,33 @@
+"""Partial indexes on active personas and schedules
+
+Revision ID: 009_active_partial_indexes
+Revises: 008_follow_targets_keyset_index
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_active_partial_indexes"
+down_revision: Union[str, None] = "008_follow_targets_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("personas", "schedules"):
+        op.create_index(
+            f"ix_{table}_user_active",
+            table,
+            ["user_id"],
+            unique=False,
+            postgresql_where=sa.text("is_active"),
+            sqlite_where=sa.text("is_active = 1"),
+        )
+
+
+def downgrade() -> None:
+    for table in ("personas", "schedules"):
+        op.drop_index(f"ix_{table}_user_active", table_name=table)
@@ -0,0 +1,31 @@
+"""Partial index on active content strategies
+
+Revision ID: 010_strategies_active_index
+Revises: 009_active_partial_indexes
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010_strategies_active_index"
+down_revision: Union[str, None] = "009_active_partial_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_content_strategies_user_active",
+        "content_strategies",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+        sqlite_where=sa.text("is_active = 1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_content_strategies_user_active", table_name="content_strategies")
@@ -0,0 +1,28 @@
+"""Index api_usage_logs for windowed usage reports
+
+Revision ID: 011_usage_logs_created_at_idx
+Revises: 010_strategies_active_index
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011_usage_logs_created_at_idx"
+down_revision: Union[str, None] = "010_strategies_active_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_api_usage_logs_created_at_endpoint",
+        "api_usage_logs",
+        ["created_at", "endpoint"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_api_usage_logs_created_at_endpoint", table_name="api_usage_logs")
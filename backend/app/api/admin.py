@@ -1,7 +1,7 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 
 from app.database import get_db
@@ -113,6 +113,7 @@ def list_all_posts(
 ):
     posts = (
         db.query(Post)
+        .options(selectinload(Post.thread_posts))
         .order_by(Post.created_at.desc())
         .offset(skip)
         .limit(limit)
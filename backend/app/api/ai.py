@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Any, Iterable, Iterator, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -33,6 +37,20 @@ def _resolve_max_length(db: Session, user_id: int, request_max_length, post_form
         return int(user_val) if user_val else 280
 
 
+def _sse(events: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+    """Format (event, data) pairs as server-sent events."""
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events: Iterable[Tuple[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/generate", response_model=AIGenerateResponse)
 def generate_posts(
     data: AIGenerateRequest,
@@ -77,6 +95,43 @@ def generate_posts(
     )
 
 
+@router.post("/generate/stream")
+def stream_generate_posts(
+    data: AIGenerateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream long-form generation as server-sent events."""
+    if data.post_format != "long_form":
+        raise HTTPException(
+            status_code=400,
+            detail="Streaming is only supported for long_form posts.",
+        )
+    service = create_ai_service(db, current_user.id)
+    language = data.language or get_user_setting(db, current_user.id, "language") or "ja"
+    max_length = _resolve_max_length(db, current_user.id, data.max_length, data.post_format)
+
+    persona = None
+    if data.use_persona:
+        persona_service = PersonaService(db)
+        persona = persona_service.get_active_persona(user_id=current_user.id)
+    strategy_service = StrategyService(db)
+    strategy = strategy_service.get_active_strategy(user_id=current_user.id)
+
+    return _sse_response(
+        service.stream_long_form(
+            genre=data.genre,
+            style=data.style,
+            count=data.count,
+            custom_prompt=data.custom_prompt,
+            persona=persona,
+            strategy=strategy,
+            language=language,
+            max_length=max_length,
+        )
+    )
+
+
 @router.post("/improve", response_model=AIImproveResponse)
 def improve_post(
     data: AIImproveRequest,
@@ -95,6 +150,26 @@ def improve_post(
     return AIImproveResponse(**result)
 
 
+@router.post("/improve/stream")
+def stream_improve_post(
+    data: AIImproveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream post improvement as server-sent events."""
+    service = create_ai_service(db, current_user.id)
+    language = data.language or get_user_setting(db, current_user.id, "language") or "ja"
+    max_length = _resolve_max_length(db, current_user.id, data.max_length, data.post_format)
+    return _sse_response(
+        service.stream_improve_post(
+            content=data.content,
+            feedback=data.feedback,
+            language=language,
+            max_length=max_length,
+        )
+    )
+
+
 @router.post("/predict", response_model=ImpressionPredictResponse)
 def predict_impressions(
     data: ImpressionPredictRequest,
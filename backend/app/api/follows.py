@@ -1,6 +1,6 @@
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -14,18 +14,22 @@ router = APIRouter(prefix="/api/follows", tags=["follows"])
 
 @router.get("", response_model=List[FollowTargetResponse])
 def list_follow_targets(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     service = FollowService(db, user_id=current_user.id)
-    targets, total = service.get_follow_targets(
+    targets, next_cursor = service.get_follow_targets(
         skip=skip, limit=limit, status=status, action=action,
-        user_id=current_user.id,
+        user_id=current_user.id, cursor=cursor,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return targets
 
 
@@ -66,10 +70,12 @@ def get_follow_stats(
 @router.get("/admin/{user_id}", response_model=List[FollowTargetResponse])
 def admin_list_follow_targets(
     user_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin),
 ):
@@ -77,10 +83,12 @@ def admin_list_follow_targets(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     service = FollowService(db, user_id=user_id)
-    targets, total = service.get_follow_targets(
+    targets, next_cursor = service.get_follow_targets(
         skip=skip, limit=limit, status=status, action=action,
-        user_id=user_id,
+        user_id=user_id, cursor=cursor,
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return targets
 
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -12,7 +13,6 @@ router = APIRouter(prefix="/api/payment", tags=["payment"])
 @router.post("/checkout")
 def create_checkout(
     tier: str = Query(..., description="Subscription tier: basic, pro, enterprise"),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     url = payment_service.create_checkout_session(
@@ -21,10 +21,6 @@ def create_checkout(
         success_url="http://localhost:3000/settings?payment=success",
         cancel_url="http://localhost:3000/settings?payment=cancelled",
     )
-
-    # Save stripe_customer_id if it was just created
-    db.commit()
-
     return {"url": url}
 
 
@@ -41,9 +37,12 @@ def create_portal(
 
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request):
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
 
-    result = payment_service.handle_webhook_event(payload, sig_header, db)
+    # The handlers query and commit synchronously; keep them off the event loop
+    result = await run_in_threadpool(
+        payment_service.handle_webhook_event, payload, sig_header
+    )
     return result
@@ -1,10 +1,10 @@
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.models import User
+from app.models.models import PostStatus, User
 from app.schemas.schemas import PostCreate, PostUpdate, PostResponse
 from app.services.post_service import PostService
 from app.utils.auth import get_current_user, get_current_admin
@@ -74,11 +74,16 @@ def delete_post(
 @router.post("/{post_id}/publish", response_model=PostResponse)
 def publish_post(
     post_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     service = PostService(db, user_id=current_user.id)
-    return service.publish_post(post_id, user_id=current_user.id)
+    post = service.publish_post(post_id, user_id=current_user.id)
+    if post.status != PostStatus.posted:
+        # First attempt failed and a retry is queued
+        response.status_code = 202
+    return post
 
 
 # --- Admin endpoints ---
@@ -153,6 +158,7 @@ def admin_delete_post(
 def admin_publish_post(
     user_id: int,
     post_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin),
 ):
@@ -160,4 +166,7 @@ def admin_publish_post(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     service = PostService(db, user_id=user_id)
-    return service.publish_post(post_id, user_id=user_id)
+    post = service.publish_post(post_id, user_id=user_id)
+    if post.status != PostStatus.posted:
+        response.status_code = 202
+    return post
@@ -9,7 +9,7 @@ from app.config import settings
 from app.models.models import AppSetting, User
 from app.schemas.schemas import AppSettingCreate, AppSettingResponse
 from app.services.x_api import create_x_api_service
-from app.services.user_settings import get_user_setting
+from app.services.user_settings import get_user_setting, invalidate_user_settings
 from app.utils.auth import get_current_user
 from app.utils.rate_limiter import rate_limiter, TIER_LIMITS
 
@@ -60,6 +60,7 @@ def update_setting_by_key(
         )
         db.add(existing)
     db.commit()
+    invalidate_user_settings(current_user.id)
     db.refresh(existing)
     return AppSettingResponse.model_validate(existing)
 
@@ -94,6 +95,7 @@ def update_settings(
             db.add(new_setting)
             updated.append(new_setting)
     db.commit()
+    invalidate_user_settings(current_user.id)
     for s in updated:
         db.refresh(s)
     return [
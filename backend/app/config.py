@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -18,6 +18,13 @@ class Settings(BaseSettings):
     # X API tier: free, basic, or pro
     X_API_TIER: str = "free"
 
+    # Circuit breaker on tweet publishing: after this many consecutive X
+    # outages (5xx/connection errors) publishes fail fast with 503
+    X_BREAKER_FAIL_MAX: int = 5
+    X_BREAKER_RESET_SECONDS: int = 60
+    # Keep-alive connections to the X API, shared by every account's client
+    X_HTTP_POOL_SIZE: int = 32
+
     # Claude API key
     CLAUDE_API_KEY: str = ""
 
@@ -27,8 +34,25 @@ class Settings(BaseSettings):
     # AI provider: "claude" or "openai"
     AI_PROVIDER: str = "claude"
 
+    # Seconds to reuse an identical analysis/prediction LLM completion
+    # (0 disables the cache); content generation is never cached
+    LLM_CACHE_TTL_SECONDS: int = 600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+
+    # SDK-level retries (with backoff) for 429/5xx/connection errors, and the
+    # circuit breaker that fails fast with 503 once a provider is degraded
+    LLM_MAX_RETRIES: int = 2
+    LLM_BREAKER_FAIL_MAX: int = 10
+    LLM_BREAKER_RESET_SECONDS: int = 30
+
+    # Worker threads for sync endpoints; each in-flight LLM call holds one
+    THREADPOOL_SIZE: int = 200
+
     # Gemini API key (for image generation)
     GEMINI_API_KEY: str = ""
+    # Directory for generated images until they are uploaded, e.g. /dev/shm
+    # to keep them off disk (empty uses the system temp dir)
+    IMAGE_TMP_DIR: str = ""
 
     # JWT Authentication
     JWT_SECRET_KEY: str = "change-me-in-production"
@@ -45,6 +69,13 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./x_auto_pilot.db"
+    # Connection pool (non-SQLite); recycle before server-side idle timeouts.
+    # Overflow defaults to covering THREADPOOL_SIZE plus the scheduler's
+    # threads, since sessions stay checked out across LLM/X calls; the
+    # database's max_connections must allow that per worker process.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_RECYCLE_SECONDS: int = 1800
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -1,23 +1,57 @@
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from typing import Generator
 
 from app.config import settings
 
+# APScheduler's default thread pool size (BackgroundScheduler's executor)
+SCHEDULER_THREADS = 10
+
 # Handle SQLite-specific connect_args
 connect_args = {}
+pool_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+else:
+    # Every request thread, and every scheduler job thread, can hold a
+    # session for a whole LLM/X round-trip, so by default the pool can open
+    # one connection per thread; the overflow ones close when returned
+    max_overflow = settings.DB_MAX_OVERFLOW
+    if max_overflow is None:
+        max_overflow = max(
+            settings.THREADPOOL_SIZE + SCHEDULER_THREADS - settings.DB_POOL_SIZE, 0
+        )
+    pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": max_overflow,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     echo=False,
+    # Room for every distinct statement the services issue, so none are
+    # recompiled after eviction
+    query_cache_size=1200,
+    # JSON columns (prediction factors, persona lists, strategy settings)
+    # go through orjson rather than the stdlib json module
+    json_serializer=lambda obj: orjson.dumps(obj).decode("utf-8"),
+    json_deserializer=orjson.loads,
+    **pool_args,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects keep their loaded state across commit, so returning one from a
+# write doesn't cost a reload SELECT; call refresh() where DB state is needed
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 Base = declarative_base()
+# Fetch server-generated columns (ids, created_at, onupdate updated_at) with
+# RETURNING on the INSERT/UPDATE itself
+Base.__mapper_args__ = {"eager_defaults": True}
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -1,10 +1,13 @@
 import logging
 import random
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import func
 
 from app.database import SessionLocal
 from app.models.models import (
@@ -21,15 +24,21 @@ from app.models.models import (
 from app.services.post_service import PostService
 from app.services.ai_service import AIService, create_ai_service
 from app.services.template_service import TemplateService
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_service import (
+    AnalyticsService,
+    iter_analytics_rows,
+    refresh_daily_analytics,
+)
 from app.services.persona_service import PersonaService
 from app.services.strategy_service import StrategyService
-from app.services.prediction_service import PredictionService
+from app.services.prediction_service import PredictionService, invalidate_recent_metrics
 from app.services.auto_pilot_service import AutoPilotService
 from app.services.image_service import ImageService
 from app.services.x_api import XApiService, create_x_api_service
 from app.services.follow_service import FollowService
 from app.services.user_settings import get_user_setting
+from app.services.x_oauth_service import cleanup_pkce_store
+from app.utils.rate_limiter import rate_limiter
 from app.utils.time_utils import parse_cron_expression
 
 logger = logging.getLogger(__name__)
@@ -72,11 +81,12 @@ def execute_scheduled_post(schedule_id: int) -> None:
 
         # Attempt to publish
         try:
-            post_service.publish_post(post.id, user_id=user_id)
-            logger.info(
-                "Scheduled post published: schedule=%d, post=%d, format=%s",
-                schedule_id, post.id, post_format,
-            )
+            post = post_service.publish_post(post.id, user_id=user_id)
+            if post.status == PostStatus.posted:
+                logger.info(
+                    "Scheduled post published: schedule=%d, post=%d, format=%s",
+                    schedule_id, post.id, post_format,
+                )
         except Exception as exc:
             logger.error(
                 "Failed to publish scheduled post: schedule=%d, error=%s",
@@ -95,6 +105,62 @@ def execute_scheduled_post(schedule_id: int) -> None:
         db.close()
 
 
+def publish_retry_job(
+    post_id: int, user_id: Optional[int], attempt: int, media_ids: Optional[List[str]]
+) -> None:
+    """Run a queued publish retry; a further failure queues the next one."""
+    db = SessionLocal()
+    try:
+        PostService(db, user_id=user_id).retry_publish(
+            post_id, attempt, media_ids=media_ids, user_id=user_id
+        )
+    except Exception as exc:
+        logger.error("Publish retry failed for post %d: %s", post_id, exc)
+    finally:
+        db.close()
+
+
+def fail_orphaned_publish_retries() -> None:
+    """Mark posts failed whose queued publish retry was lost with the process.
+
+    Retry jobs live in the in-memory job store, so after a restart no job
+    will ever run for them; their media_ids are gone too, so they cannot be
+    requeued faithfully. The user can publish them again by hand.
+    """
+    db = SessionLocal()
+    try:
+        orphaned = (
+            db.query(Post)
+            .filter(Post.status == PostStatus.scheduled, Post.retry_count > 0)
+            .update({Post.status: PostStatus.failed}, synchronize_session=False)
+        )
+        db.commit()
+        if orphaned:
+            logger.warning("Marked %d posts with lost publish retries as failed", orphaned)
+    except Exception as exc:
+        logger.error("Failed to recover orphaned publish retries: %s", exc)
+    finally:
+        db.close()
+
+
+def enqueue_publish_retry(
+    post_id: int,
+    user_id: Optional[int],
+    attempt: int,
+    media_ids: Optional[List[str]],
+    delay: float,
+) -> None:
+    """Queue attempt number `attempt` of a post publish to run after `delay` seconds."""
+    scheduler.add_job(
+        publish_retry_job,
+        trigger=DateTrigger(run_date=datetime.now() + timedelta(seconds=delay)),
+        args=[post_id, user_id, attempt, media_ids],
+        id=f"publish_retry_{post_id}",
+        name=f"Publish retry: post {post_id}",
+        replace_existing=True,
+    )
+
+
 def _generate_content(schedule: Schedule, db, user_id=None) -> tuple:
     """Generate post content based on the schedule configuration.
 
@@ -188,7 +254,7 @@ def collect_analytics_job() -> None:
     try:
         # Collect analytics per user: group posts by user_id
         posted_posts = (
-            db.query(Post)
+            db.query(Post.id, Post.x_tweet_id, Post.user_id)
             .filter(
                 Post.status == PostStatus.posted,
                 Post.x_tweet_id.isnot(None),
@@ -199,43 +265,34 @@ def collect_analytics_job() -> None:
         # Group by user_id
         user_posts = {}
         for post in posted_posts:
-            uid = post.user_id
-            if uid not in user_posts:
-                user_posts[uid] = []
-            user_posts[uid].append(post)
+            user_posts.setdefault(post.user_id, []).append(post)
 
+        started = datetime.utcnow()
         total_collected = 0
         total_errors = 0
         for uid, posts in user_posts.items():
-            if uid is not None:
-                x_api = create_x_api_service(db, uid)
-            else:
-                x_api = XApiService()
-
-            for post in posts:
-                try:
-                    metrics = x_api.get_tweet_metrics(post.x_tweet_id)
-                    analytics = PostAnalytics(
-                        post_id=post.id,
-                        impressions=metrics.get("impressions", 0),
-                        likes=metrics.get("likes", 0),
-                        retweets=metrics.get("retweets", 0),
-                        replies=metrics.get("replies", 0),
-                        quotes=metrics.get("quotes", 0),
-                        bookmarks=metrics.get("bookmarks", 0),
-                        profile_visits=metrics.get("profile_visits", 0),
-                        collected_at=datetime.utcnow(),
-                    )
-                    db.add(analytics)
-                    total_collected += 1
-                except Exception as exc:
-                    logger.warning(
-                        "Failed to collect analytics for post %d: %s",
-                        post.id, exc,
-                    )
-                    total_errors += 1
+            collected = 0
+            try:
+                if uid is not None:
+                    x_api = create_x_api_service(db, uid)
+                else:
+                    x_api = XApiService()
+                for rows in iter_analytics_rows(x_api, posts):
+                    if rows:
+                        db.bulk_insert_mappings(PostAnalytics, rows)
+                        collected += len(rows)
+            except Exception as exc:
+                logger.warning(
+                    "Failed to collect analytics for user %s: %s", uid, exc,
+                )
+            total_collected += collected
+            total_errors += len(posts) - collected
 
+        if total_collected:
+            refresh_daily_analytics(db, started.date())
         db.commit()
+        if total_collected:
+            invalidate_recent_metrics()
         logger.info(
             "Analytics collection job completed: %d succeeded, %d failed",
             total_collected, total_errors,
@@ -250,31 +307,41 @@ def track_prediction_accuracy() -> None:
     """Periodic job to update prediction records with actual impression data."""
     db = SessionLocal()
     try:
-        # Find predictions that have a post_id but no actual_impressions
-        predictions = (
-            db.query(ImpressionPrediction)
+        # Posts with predictions still missing actual_impressions
+        pending_posts = (
+            db.query(ImpressionPrediction.post_id)
             .filter(
                 ImpressionPrediction.post_id.isnot(None),
                 ImpressionPrediction.actual_impressions.is_(None),
             )
-            .all()
+            .distinct()
+            .subquery()
         )
-
-        updated = 0
-        for pred in predictions:
-            # Get latest analytics for this post
-            analytics = (
-                db.query(PostAnalytics)
-                .filter(PostAnalytics.post_id == pred.post_id)
-                .order_by(PostAnalytics.collected_at.desc())
-                .first()
+        # Latest collected analytics for each of those posts, in one query
+        latest = (
+            db.query(
+                PostAnalytics.post_id,
+                func.max(PostAnalytics.collected_at).label("collected_at"),
+            )
+            .filter(PostAnalytics.post_id.in_(db.query(pending_posts.c.post_id)))
+            .group_by(PostAnalytics.post_id)
+            .subquery()
+        )
+        rows = (
+            db.query(PostAnalytics.post_id, PostAnalytics.impressions)
+            .join(
+                latest,
+                (PostAnalytics.post_id == latest.c.post_id)
+                & (PostAnalytics.collected_at == latest.c.collected_at),
             )
-            if analytics and analytics.impressions > 0:
-                pred.actual_impressions = analytics.impressions
-                updated += 1
+            .filter(PostAnalytics.impressions > 0)
+            .all()
+        )
 
-        db.commit()
-        logger.info("Prediction accuracy tracking: updated %d records", updated)
+        actual_by_post = {row.post_id: row.impressions for row in rows}
+        PredictionService(db).update_actual_many(actual_by_post)
+        updated = len(actual_by_post)
+        logger.info("Prediction accuracy tracking: updated %d posts", updated)
     except Exception as exc:
         logger.error("Prediction accuracy tracking failed: %s", exc)
     finally:
@@ -419,8 +486,9 @@ def _auto_post_for_user(db, user_id: int) -> None:
 
     # Publish
     try:
-        post_service.publish_post(post.id, media_ids=media_ids, user_id=user_id)
-        logger.info("Auto-post: published post id=%d format=%s for user %d", post.id, post_format, user_id)
+        post = post_service.publish_post(post.id, media_ids=media_ids, user_id=user_id)
+        if post.status == PostStatus.posted:
+            logger.info("Auto-post: published post id=%d format=%s for user %d", post.id, post_format, user_id)
     except Exception as exc:
         logger.error("Auto-post: publish failed for user %d: %s", user_id, exc)
     finally:
@@ -475,54 +543,54 @@ def _auto_follow_for_user(db, user_id: int) -> None:
     follow_service = FollowService(db, user_id=user_id)
     x_api = create_x_api_service(db, user_id)
 
-    followed_count = 0
+    # Discover up to daily_limit new users, then follow them as one batch
+    from app.models.models import FollowTarget
+    new_targets = []
     for keyword in keywords:
-        if followed_count >= daily_limit:
+        if len(new_targets) >= daily_limit:
             break
 
         try:
-            # Discover users
             users = x_api.search_users(keyword, max_results=10)
-            for user_data in users:
-                if followed_count >= daily_limit:
-                    break
-
-                # Check if already in targets
-                from app.models.models import FollowTarget
-                existing = (
-                    db.query(FollowTarget)
-                    .filter(FollowTarget.x_user_id == user_data["id"])
-                    .first()
-                )
-                if existing:
-                    continue
-
-                # Create follow target
-                target = FollowTarget(
+        except Exception as exc:
+            logger.warning("Auto-follow: search failed for '%s': %s", keyword, exc)
+            continue
+
+        # Skip users already in targets with one lookup per search
+        candidate_ids = [u["id"] for u in users]
+        known = {
+            row.x_user_id
+            for row in db.query(FollowTarget.x_user_id)
+            .filter(FollowTarget.x_user_id.in_(candidate_ids))
+            .all()
+        }
+        known.update(t.x_user_id for t in new_targets)
+        for user_data in users:
+            if len(new_targets) >= daily_limit:
+                break
+            if user_data["id"] in known:
+                continue
+            known.add(user_data["id"])
+            new_targets.append(
+                FollowTarget(
                     x_user_id=user_data["id"],
                     x_username=user_data["username"],
                     user_id=user_id,
                 )
-                db.add(target)
-                db.commit()
-                db.refresh(target)
+            )
 
-                # Execute follow
-                try:
-                    follow_service.execute_follow(target.id, user_id=user_id)
-                    followed_count += 1
-                    logger.info(
-                        "Auto-follow: followed @%s for user %d (%d/%d)",
-                        user_data["username"], user_id, followed_count, daily_limit,
-                    )
-                    # Rate limit pause
-                    import time
-                    time.sleep(2)
-                except Exception as exc:
-                    logger.warning("Auto-follow: failed to follow @%s: %s", user_data["username"], exc)
+    followed_count = 0
+    if new_targets:
+        db.add_all(new_targets)
+        db.flush()
+        target_ids = [t.id for t in new_targets]
+        db.commit()
 
-        except Exception as exc:
-            logger.warning("Auto-follow: search failed for '%s': %s", keyword, exc)
+        # Follows stay 2 seconds apart for rate limiting
+        result = follow_service.execute_follows_batch(
+            target_ids, user_id=user_id, pause_seconds=2,
+        )
+        followed_count = result["completed"]
 
     logger.info("Auto-follow job completed for user %d: %d users followed", user_id, followed_count)
 
@@ -578,12 +646,23 @@ def refresh_expiring_tokens_job() -> None:
         db.close()
 
 
+def flush_usage_logs_job() -> None:
+    """Write API usage log rows queued by the rate limiter."""
+    db = SessionLocal()
+    try:
+        rate_limiter.flush_usage_logs(db)
+    except Exception as exc:
+        logger.error("Failed to flush API usage logs: %s", exc)
+    finally:
+        db.close()
+
+
 def sync_schedules() -> None:
     """Synchronize active schedules from the database to APScheduler."""
     db = SessionLocal()
     try:
         active_schedules = (
-            db.query(Schedule).filter(Schedule.is_active == True).all()
+            db.query(Schedule).filter(Schedule.is_active).all()
         )
 
         # Get current APScheduler job IDs
@@ -656,6 +735,9 @@ def start_scheduler() -> None:
         logger.info("Scheduler is already running.")
         return
 
+    # The job store starts empty, so any retry recorded in the database is lost
+    fail_orphaned_publish_retries()
+
     # Add a periodic job to collect analytics every 6 hours
     scheduler.add_job(
         collect_analytics_job,
@@ -710,6 +792,24 @@ def start_scheduler() -> None:
         replace_existing=True,
     )
 
+    # Expire abandoned OAuth 2.0 PKCE states every minute
+    scheduler.add_job(
+        cleanup_pkce_store,
+        IntervalTrigger(minutes=1),
+        id="pkce_cleanup",
+        name="PKCE State Cleanup",
+        replace_existing=True,
+    )
+
+    # Batched API usage logs, flushed every second
+    scheduler.add_job(
+        flush_usage_logs_job,
+        IntervalTrigger(seconds=1),
+        id="usage_log_flush",
+        name="API Usage Log Flush",
+        replace_existing=True,
+    )
+
     scheduler.start()
     logger.info("Background scheduler started.")
 
@@ -722,3 +822,4 @@ def shutdown_scheduler() -> None:
     if scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("Background scheduler shut down.")
+    flush_usage_logs_job()
@@ -1,9 +1,10 @@
 import logging
 from contextlib import asynccontextmanager
 
+import anyio.to_thread
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.config import settings
 from app.database import engine, Base, get_db
@@ -78,6 +79,10 @@ def _seed_admin_settings(db, admin_id: int) -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Sync endpoints run in anyio's worker threads (40 by default) and block one
+    # for the whole LLM/X API round-trip, so size the pool for that concurrency
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+
     # Startup: create tables and start scheduler
     logger.info("Creating database tables...")
     Base.metadata.create_all(bind=engine)
@@ -87,6 +92,7 @@ async def lifespan(app: FastAPI):
     from app.database import SessionLocal
     from app.models.models import User, UserRole, SubscriptionTier, AppSetting
     from app.utils.auth import hash_password
+    from app.services.analytics_service import backfill_daily_analytics
     db = SessionLocal()
     try:
         admin = db.query(User).filter(User.email == "admin@example.com").first()
@@ -110,6 +116,9 @@ async def lifespan(app: FastAPI):
 
         # Seed admin API key settings from env vars (every startup)
         _seed_admin_settings(db, admin.id)
+
+        # Fill in trend history the daily rollup doesn't have yet
+        backfill_daily_analytics(db)
     finally:
         db.close()
 
@@ -139,6 +148,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
@@ -201,6 +211,7 @@ def get_dashboard(
 
     recent_posts = (
         db.query(Post)
+        .options(selectinload(Post.thread_posts))
         .filter(Post.user_id == current_user.id)
         .order_by(Post.created_at.desc())
         .limit(5)
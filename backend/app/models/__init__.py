@@ -4,6 +4,7 @@ from app.models.models import (
     Schedule,
     FollowTarget,
     PostAnalytics,
+    DailyPostAnalytics,
     AppSetting,
     PdcaLog,
     ApiUsageLog,
@@ -15,6 +16,7 @@ __all__ = [
     "Schedule",
     "FollowTarget",
     "PostAnalytics",
+    "DailyPostAnalytics",
     "AppSetting",
     "PdcaLog",
     "ApiUsageLog",
@@ -7,13 +7,16 @@ from sqlalchemy import (
     String,
     Text,
     Boolean,
+    Date,
     DateTime,
     Enum,
     JSON,
     Float,
     ForeignKey,
+    Index,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship
 
@@ -94,6 +97,10 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_status_posted_at", "status", "posted_at"),
+        Index("ix_posts_user_status_posted_at", "user_id", "status", "posted_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     content = Column(Text, nullable=False)
@@ -147,6 +154,16 @@ class Template(Base):
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # Partial: only active rows are looked up. The predicate matches how
+        # each dialect renders a boolean filter (SQLite has no native bool).
+        Index(
+            "ix_schedules_user_active",
+            "user_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -169,6 +186,9 @@ class Schedule(Base):
 
 class FollowTarget(Base):
     __tablename__ = "follow_targets"
+    __table_args__ = (
+        Index("ix_follow_targets_user_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -187,6 +207,15 @@ class FollowTarget(Base):
 
 class PostAnalytics(Base):
     __tablename__ = "post_analytics"
+    __table_args__ = (
+        # Rows are appended in collected_at order, so PostgreSQL gets a BRIN index
+        Index(
+            "ix_post_analytics_collected_at",
+            "collected_at",
+            postgresql_using="brin",
+        ),
+        Index("ix_post_analytics_post_id_collected_at", "post_id", "collected_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
@@ -203,6 +232,24 @@ class PostAnalytics(Base):
     post = relationship("Post", back_populates="analytics")
 
 
+class DailyPostAnalytics(Base):
+    """Per-user daily rollup of post_analytics, rebuilt after each collection."""
+
+    __tablename__ = "daily_post_analytics"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_daily_post_analytics_user_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    date = Column(Date, nullable=False)
+    impressions = Column(Integer, default=0, nullable=False)
+    likes = Column(Integer, default=0, nullable=False)
+    retweets = Column(Integer, default=0, nullable=False)
+    replies = Column(Integer, default=0, nullable=False)
+    posts_tracked = Column(Integer, default=0, nullable=False)
+
+
 class AppSetting(Base):
     __tablename__ = "app_settings"
     __table_args__ = (
@@ -235,6 +282,10 @@ class PdcaLog(Base):
 
 class ApiUsageLog(Base):
     __tablename__ = "api_usage_logs"
+    __table_args__ = (
+        # Usage reports filter on created_at and group by endpoint (and day)
+        Index("ix_api_usage_logs_created_at_endpoint", "created_at", "endpoint"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     endpoint = Column(String(255), nullable=False)
@@ -246,6 +297,15 @@ class ApiUsageLog(Base):
 
 class Persona(Base):
     __tablename__ = "personas"
+    __table_args__ = (
+        # Partial, as on schedules: at most one active persona per user
+        Index(
+            "ix_personas_user_active",
+            "user_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -270,6 +330,15 @@ class Persona(Base):
 
 class ContentStrategy(Base):
     __tablename__ = "content_strategies"
+    __table_args__ = (
+        # Partial, as on personas: at most one active strategy per user
+        Index(
+            "ix_content_strategies_user_active",
+            "user_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -1,15 +1,36 @@
-import json
+import atexit
+import copy
+import functools
+import hashlib
 import logging
-from typing import Optional, List, Dict, Any
+import math
+import threading
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 
 import anthropic
+import httpx
+import orjson
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+OPENAI_MODEL = "gpt-4o"
+
+# Exact-match cache of LLM completions keyed by a digest of the full request.
+# Only callers that pass cache=True use it: deterministic analysis, never the
+# creative generation the scheduler publishes, which must differ per run.
+_llm_cache = TTLCache(
+    ttl=settings.LLM_CACHE_TTL_SECONDS,
+    maxsize=settings.LLM_CACHE_MAX_ENTRIES,
+)
+
 LANGUAGE_NAMES = {
     "ja": "Japanese (日本語)",
     "en": "English",
@@ -19,6 +40,141 @@ LANGUAGE_NAMES = {
 }
 
 
+def _string_array() -> Dict[str, Any]:
+    return {"type": "array", "items": {"type": "string"}}
+
+
+# JSON schemas for structured output, by name. Claude receives them as a
+# forced tool; OpenAI as a strict json_schema response_format.
+OUTPUT_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "return_posts": {
+        "description": "Return the generated posts.",
+        "schema": {
+            "type": "object",
+            "properties": {"posts": _string_array()},
+            "required": ["posts"],
+            "additionalProperties": False,
+        },
+    },
+    "return_threads": {
+        "description": "Return the generated threads, each a list of tweets.",
+        "schema": {
+            "type": "object",
+            "properties": {"threads": {"type": "array", "items": _string_array()}},
+            "required": ["threads"],
+            "additionalProperties": False,
+        },
+    },
+    "return_improvement": {
+        "description": "Return the improved post and why it is better.",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "improved": {"type": "string"},
+                "explanation": {"type": "string"},
+            },
+            "required": ["improved", "explanation"],
+            "additionalProperties": False,
+        },
+    },
+    "return_analysis": {
+        "description": "Return the performance analysis.",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "analysis": {"type": "string"},
+                "top_performing": _string_array(),
+                "improvement_areas": _string_array(),
+                "recommendations": _string_array(),
+            },
+            "required": [
+                "analysis",
+                "top_performing",
+                "improvement_areas",
+                "recommendations",
+            ],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+# Fields of each metrics row that are sent to the model for analysis
+_ANALYSIS_FIELDS = ("post_id", "impressions", "likes", "retweets", "replies", "posted_at")
+_ANALYSIS_CONTENT_CHARS = 50
+# Above this many rows only the extremes plus summary stats are sent
+_ANALYSIS_MAX_ROWS = 50
+_ANALYSIS_EXTREME_ROWS = 10
+
+
+def _compact_metrics_payload(metrics_data: List[Dict[str, Any]]) -> str:
+    """Serialize metrics rows as compact JSON trimmed to what the analysis needs."""
+
+    def trim(row: Dict[str, Any]) -> Dict[str, Any]:
+        item = {k: row.get(k) for k in _ANALYSIS_FIELDS}
+        item["content"] = (row.get("content") or "")[:_ANALYSIS_CONTENT_CHARS]
+        return item
+
+    if len(metrics_data) <= _ANALYSIS_MAX_ROWS:
+        payload: Any = [trim(row) for row in metrics_data]
+    else:
+        def engagement(row: Dict[str, Any]) -> int:
+            return (row.get("likes") or 0) + (row.get("retweets") or 0) + (row.get("replies") or 0)
+
+        ranked = sorted(metrics_data, key=engagement, reverse=True)
+        count = len(metrics_data)
+        summary = {"posts": count}
+        for key in ("impressions", "likes", "retweets", "replies"):
+            values = [row.get(key) or 0 for row in metrics_data]
+            summary[f"total_{key}"] = sum(values)
+            summary[f"avg_{key}"] = round(sum(values) / count, 1)
+        payload = {
+            "summary": summary,
+            "top_posts": [trim(row) for row in ranked[:_ANALYSIS_EXTREME_ROWS]],
+            "bottom_posts": [trim(row) for row in ranked[-_ANALYSIS_EXTREME_ROWS:]],
+        }
+    return orjson.dumps(payload).decode("utf-8")
+
+
+def _truncate(text: str, max_length: int) -> str:
+    """Clip text to max_length, marking the cut with an ellipsis."""
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+
+# Output tokens per character of generated text: CJK scripts run close to one
+# token per character, alphabetic languages around four characters per token
+_CJK_LANGUAGES = {"ja", "zh", "ko"}
+_TOKENS_PER_CHAR_CJK = 1.0
+_TOKENS_PER_CHAR_LATIN = 0.3
+# JSON/tool-call framing per generated item and per response
+_ITEM_OVERHEAD_TOKENS = 16
+_RESPONSE_OVERHEAD_TOKENS = 128
+# Headroom for text denser than the per-char averages (numbers, URLs, emoji,
+# JSON escapes); a response cut off by max_tokens is unparseable
+_TOKEN_SAFETY_FACTOR = 1.3
+_MIN_OUTPUT_TOKENS = 256
+_EXPLANATION_CHARS = 150
+
+
+def _output_token_budget(
+    max_chars: int, items: int, language: str, ceiling: int
+) -> int:
+    """max_tokens large enough for `items` texts of up to max_chars each.
+
+    Output is generated token by token, so a tight cap bounds worst-case
+    latency and cost; the ceiling keeps the previous fixed limits as an upper bound.
+    """
+    per_char = _TOKENS_PER_CHAR_CJK if language in _CJK_LANGUAGES else _TOKENS_PER_CHAR_LATIN
+    per_item = max_chars * per_char + _ITEM_OVERHEAD_TOKENS
+    estimate = (items * per_item + _RESPONSE_OVERHEAD_TOKENS) * _TOKEN_SAFETY_FACTOR
+    return min(ceiling, max(_MIN_OUTPUT_TOKENS, math.ceil(estimate)))
+
+
+def _improve_token_budget(language: str, max_length: int) -> int:
+    """Room for the improved post plus a one-sentence explanation."""
+    return _output_token_budget(max_length + _EXPLANATION_CHARS, 1, language, 512)
+
+
 def _build_language_instruction(language: str) -> str:
     """Build a language instruction string for system prompts."""
     lang_name = LANGUAGE_NAMES.get(language, language)
@@ -28,6 +184,232 @@ def _build_language_instruction(language: str) -> str:
     )
 
 
+# Shared SDK clients keyed by API key digest so every AIService built for the
+# same credentials reuses one warm connection pool.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_anthropic_clients: Dict[str, anthropic.Anthropic] = {}
+_openai_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _key_digest(api_key: str) -> str:
+    return hashlib.blake2b(api_key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_anthropic_client(api_key: str) -> anthropic.Anthropic:
+    digest = _key_digest(api_key)
+    client = _anthropic_clients.get(digest)
+    if client is None:
+        with _clients_lock:
+            client = _anthropic_clients.get(digest)
+            if client is None:
+                client = anthropic.Anthropic(
+                    api_key=api_key,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    http_client=httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+                )
+                _anthropic_clients[digest] = client
+    return client
+
+
+def _get_openai_client(api_key: str):
+    digest = _key_digest(api_key)
+    client = _openai_clients.get(digest)
+    if client is None:
+        import openai
+
+        with _clients_lock:
+            client = _openai_clients.get(digest)
+            if client is None:
+                client = openai.OpenAI(
+                    api_key=api_key,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    http_client=httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+                )
+                _openai_clients[digest] = client
+    return client
+
+
+@atexit.register
+def _close_shared_clients() -> None:
+    with _clients_lock:
+        for client in [*_anthropic_clients.values(), *_openai_clients.values()]:
+            try:
+                client.close()
+            except Exception:
+                pass
+        _anthropic_clients.clear()
+        _openai_clients.clear()
+
+
+def _is_provider_failure(exc: BaseException) -> bool:
+    """Whether an error means the provider itself is degraded.
+
+    Only 5xx responses and connection/timeout errors count; 4xx responses are
+    caused by the request or the tenant's key and must not trip the circuit.
+    """
+    if isinstance(exc, HTTPException):
+        return False
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    # anthropic and openai both define APIConnectionError (APITimeoutError
+    # subclasses it); openai is imported lazily so match by name
+    return any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__)
+
+
+_llm_breakers: Dict[str, CircuitBreaker] = {
+    provider: CircuitBreaker(
+        provider,
+        fail_max=settings.LLM_BREAKER_FAIL_MAX,
+        reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+        is_failure=_is_provider_failure,
+    )
+    for provider in ("claude", "openai")
+}
+
+
+def _llm_http_error(exc: Exception) -> HTTPException:
+    """Map an error from an LLM call to the HTTPException returned to clients."""
+    if isinstance(exc, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail="AI provider is temporarily unavailable. Please try again shortly.",
+        )
+    return HTTPException(status_code=502, detail=f"AI API error: {exc}")
+
+
+# Built persona/strategy prompt sections keyed by (kind, id, updated_at); an
+# edit bumps updated_at, so stale entries are simply never looked up again.
+_context_cache = TTLCache(ttl=3600, maxsize=1024)
+
+
+def _cached_context(kind: str, obj, build) -> str:
+    """Return build(obj), memoized per row version when the row is persisted."""
+    obj_id = getattr(obj, "id", None)
+    if obj_id is None:
+        return build(obj)
+    key = (kind, obj_id, getattr(obj, "updated_at", None))
+    context = _context_cache.get(key)
+    if context is None:
+        context = build(obj)
+        _context_cache.set(key, context)
+    return context
+
+
+def _llm_cache_key(service: "AIService", *parts: str) -> str:
+    """Digest everything that determines a completion, including the API key.
+
+    The key hash keeps tenants with their own credentials from sharing entries;
+    persona/strategy context is already part of the system prompt.
+    """
+    if service.provider == "openai":
+        model, api_key = OPENAI_MODEL, service._openai_api_key
+    else:
+        model, api_key = CLAUDE_MODEL, service._claude_api_key
+    h = hashlib.blake2b(digest_size=20)
+    for part in (service.provider, model, api_key or "", *parts):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+# Futures for LLM calls currently in flight, keyed like _llm_cache
+_inflight_llm_calls: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _cached_llm_call(func):
+    """Serve repeated identical LLM calls from _llm_cache when cache=True.
+
+    Identical cached calls that arrive while one is already in flight wait for
+    that call's result instead of issuing their own request. Uncached calls go
+    straight to the provider. Callers always get their own copy of the result.
+    """
+
+    @functools.wraps(func)
+    def wrapper(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 1024,
+        *extra: str,
+        cache: bool = False,
+    ):
+        if not cache:
+            return func(self, system_prompt, user_prompt, max_tokens, *extra)
+
+        key = _llm_cache_key(
+            self, func.__name__, str(max_tokens), system_prompt, user_prompt, *extra
+        )
+        cached = _llm_cache.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit: %s", key)
+            return copy.deepcopy(cached)
+
+        with _inflight_lock:
+            future = _inflight_llm_calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                _inflight_llm_calls[key] = future
+        if not is_leader:
+            logger.debug("LLM call coalesced: %s", key)
+            return copy.deepcopy(future.result())
+
+        try:
+            result = func(self, system_prompt, user_prompt, max_tokens, *extra)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            _llm_cache.set(key, result)
+            future.set_result(result)
+            return copy.deepcopy(result)
+        finally:
+            with _inflight_lock:
+                _inflight_llm_calls.pop(key, None)
+
+    return wrapper
+
+
+class _JsonArrayStringScanner:
+    """Incrementally pick complete top-level strings out of a streamed JSON array."""
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buf: List[str] = []
+
+    def feed(self, text: str) -> List[str]:
+        completed: List[str] = []
+        for ch in text:
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        try:
+                            completed.append(orjson.loads("".join(self._buf)))
+                        except ValueError:
+                            pass
+                    self._buf = []
+            elif ch == '"':
+                self._in_string = True
+                self._buf = [ch]
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+        return completed
+
+
 class AIService:
     def __init__(
         self,
@@ -50,22 +432,25 @@ class AIService:
                     status_code=500,
                     detail="CLAUDE_API_KEY is not configured.",
                 )
-            self._claude_client = anthropic.Anthropic(api_key=self._claude_api_key)
+            self._claude_client = _get_anthropic_client(self._claude_api_key)
         return self._claude_client
 
     @property
     def openai_client(self):
         if self._openai_client is None:
-            import openai
-
             if not self._openai_api_key:
                 raise HTTPException(
                     status_code=500,
                     detail="OPENAI_API_KEY is not configured.",
                 )
-            self._openai_client = openai.OpenAI(api_key=self._openai_api_key)
+            self._openai_client = _get_openai_client(self._openai_api_key)
         return self._openai_client
 
+    @property
+    def _breaker(self) -> CircuitBreaker:
+        return _llm_breakers["openai" if self.provider == "openai" else "claude"]
+
+    @_cached_llm_call
     def call_llm(
         self,
         system_prompt: str,
@@ -73,29 +458,118 @@ class AIService:
         max_tokens: int = 1024,
     ) -> str:
         """Call the configured LLM provider and return the text response."""
-        if self.provider == "openai":
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                max_tokens=max_tokens,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
-            return response.choices[0].message.content.strip()
-        else:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            return message.content[0].text.strip()
+        with self._breaker.call():
+            if self.provider == "openai":
+                response = self.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    max_tokens=max_tokens,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                )
+                return response.choices[0].message.content.strip()
+            else:
+                message = self.client.messages.create(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": user_prompt}],
+                )
+                return message.content[0].text.strip()
+
+    @_cached_llm_call
+    def call_llm_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        schema_name: str,
+    ) -> Dict[str, Any]:
+        """Call the configured LLM provider with a structured output schema.
+
+        The provider guarantees the returned object is valid JSON matching
+        OUTPUT_SCHEMAS[schema_name].
+        """
+        with self._breaker.call():
+            output = OUTPUT_SCHEMAS[schema_name]
+            if self.provider == "openai":
+                response = self.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    max_tokens=max_tokens,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    response_format={
+                        "type": "json_schema",
+                        "json_schema": {
+                            "name": schema_name,
+                            "schema": output["schema"],
+                            "strict": True,
+                        },
+                    },
+                )
+                return orjson.loads(response.choices[0].message.content)
+            else:
+                message = self.client.messages.create(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": user_prompt}],
+                    tools=[
+                        {
+                            "name": schema_name,
+                            "description": output["description"],
+                            "input_schema": output["schema"],
+                        }
+                    ],
+                    tool_choice={"type": "tool", "name": schema_name},
+                )
+                for block in message.content:
+                    if block.type == "tool_use":
+                        return block.input
+                raise ValueError("Response did not include structured output")
+
+    def stream_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int = 1024,
+    ) -> Iterator[str]:
+        """Call the configured LLM provider and yield text chunks as they arrive."""
+        with self._breaker.call():
+            if self.provider == "openai":
+                stream = self.openai_client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    max_tokens=max_tokens,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    stream=True,
+                )
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            else:
+                with self.client.messages.stream(
+                    model=CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": user_prompt}],
+                ) as stream:
+                    for text in stream.text_stream:
+                        yield text
 
     def _build_persona_context(self, persona) -> str:
         """Build a system prompt section from a persona object."""
         if not persona:
             return ""
+        return _cached_context("persona", persona, self._render_persona_context)
+
+    @staticmethod
+    def _render_persona_context(persona) -> str:
         parts = [f"\n\nYou are writing as the persona '{persona.name}'."]
         if persona.description:
             parts.append(f"Description: {persona.description}")
@@ -121,6 +595,10 @@ class AIService:
         """Build a system prompt section from a strategy object."""
         if not strategy:
             return ""
+        return _cached_context("strategy", strategy, self._render_strategy_context)
+
+    @staticmethod
+    def _render_strategy_context(strategy) -> str:
         parts = [f"\n\nContent Strategy '{strategy.name}':"]
         if strategy.content_pillars:
             parts.append(f"Content pillars: {', '.join(strategy.content_pillars)}")
@@ -153,8 +631,7 @@ class AIService:
             "You are an expert social media strategist specializing in X (Twitter). "
             "You create viral, engaging posts that drive impressions and engagement. "
             f"Every post MUST be {max_length} characters or fewer. "
-            "Include relevant hashtags when appropriate. "
-            "Return ONLY a valid JSON array of strings, no other text."
+            "Include relevant hashtags when appropriate."
         )
         system_prompt += _build_language_instruction(language)
         system_prompt += self._build_persona_context(persona)
@@ -170,54 +647,47 @@ class AIService:
         if custom_prompt:
             user_prompt += f"\n\nAdditional instructions: {custom_prompt}"
 
-        user_prompt += (
-            f"\n\nReturn exactly {count} posts as a JSON array of strings. "
-            "Example: [\"Post 1 text here\", \"Post 2 text here\"]"
-        )
+        user_prompt += f"\n\nReturn exactly {count} posts."
 
         try:
-            response_text = self.call_llm(system_prompt, user_prompt, 1024)
-            posts = json.loads(response_text)
-            if not isinstance(posts, list):
-                raise ValueError("Response is not a list")
-            validated_posts = []
-            for post in posts:
-                if isinstance(post, str) and len(post) <= max_length:
-                    validated_posts.append(post)
-                elif isinstance(post, str):
-                    validated_posts.append(post[:max_length - 3] + "...")
+            max_tokens = _output_token_budget(max_length, count, language, 1024)
+            result = self.call_llm_json(system_prompt, user_prompt, max_tokens, "return_posts")
+            validated_posts = [
+                _truncate(post, max_length)
+                for post in result.get("posts", [])
+                if isinstance(post, str)
+            ]
             return {"posts": validated_posts[:count], "post_format": "tweet"}
-        except json.JSONDecodeError:
-            logger.error("Failed to parse AI response as JSON: %s", response_text)
-            raise HTTPException(
-                status_code=502,
-                detail="AI returned an invalid response format.",
-            )
         except Exception as exc:
             logger.error("AI API error: %s", exc)
-            raise HTTPException(
-                status_code=502, detail=f"AI API error: {exc}"
-            ) from exc
+            raise _llm_http_error(exc) from exc
 
-    def generate_long_form(
+    def _build_long_form_prompts(
         self,
         genre: str,
-        style: str = "casual",
-        count: int = 1,
-        custom_prompt: Optional[str] = None,
-        persona=None,
-        strategy=None,
-        language: str = "ja",
-        max_length: int = 5000,
-    ) -> Dict[str, Any]:
-        """Generate long-form posts (up to max_length chars)."""
+        style: str,
+        count: int,
+        custom_prompt: Optional[str],
+        persona,
+        strategy,
+        language: str,
+        max_length: int,
+        stream: bool = False,
+    ) -> Tuple[str, str]:
+        """Build the (system, user) prompt pair for long-form generation.
+
+        The structured-output path gets its shape from the return_posts
+        schema; only the streamed path, which parses raw text, asks for a
+        bare JSON array.
+        """
         min_length = min(1000, max_length // 2)
         system_prompt = (
             "You are an expert content creator for X (Twitter) long-form posts. "
             f"Create compelling, in-depth posts between {min_length} and {max_length} characters. "
-            "Structure them with clear paragraphs and engaging hooks. "
-            "Return ONLY a valid JSON array of strings, no other text."
+            "Structure them with clear paragraphs and engaging hooks."
         )
+        if stream:
+            system_prompt += " Return ONLY a valid JSON array of strings, no other text."
         system_prompt += _build_language_instruction(language)
         system_prompt += self._build_persona_context(persona)
         system_prompt += self._build_strategy_context(strategy)
@@ -232,23 +702,82 @@ class AIService:
         if custom_prompt:
             user_prompt += f"\n\nAdditional instructions: {custom_prompt}"
 
-        user_prompt += (
-            f"\n\nReturn exactly {count} posts as a JSON array of strings."
+        if stream:
+            user_prompt += f"\n\nReturn exactly {count} posts as a JSON array of strings."
+        else:
+            user_prompt += f"\n\nReturn exactly {count} posts."
+        return system_prompt, user_prompt
+
+    @staticmethod
+    def _validate_long_form(posts: Any, count: int) -> Dict[str, Any]:
+        if not isinstance(posts, list):
+            raise ValueError("Response is not a list")
+        validated = [p for p in posts if isinstance(p, str)]
+        return {"posts": validated[:count], "post_format": "long_form"}
+
+    def generate_long_form(
+        self,
+        genre: str,
+        style: str = "casual",
+        count: int = 1,
+        custom_prompt: Optional[str] = None,
+        persona=None,
+        strategy=None,
+        language: str = "ja",
+        max_length: int = 5000,
+    ) -> Dict[str, Any]:
+        """Generate long-form posts (up to max_length chars)."""
+        system_prompt, user_prompt = self._build_long_form_prompts(
+            genre, style, count, custom_prompt, persona, strategy, language, max_length
+        )
+
+        try:
+            max_tokens = _output_token_budget(max_length, count, language, 4096)
+            result = self.call_llm_json(system_prompt, user_prompt, max_tokens, "return_posts")
+            return self._validate_long_form(result.get("posts", []), count)
+        except Exception as exc:
+            logger.error("AI API error: %s", exc)
+            raise _llm_http_error(exc) from exc
+
+    def stream_long_form(
+        self,
+        genre: str,
+        style: str = "casual",
+        count: int = 1,
+        custom_prompt: Optional[str] = None,
+        persona=None,
+        strategy=None,
+        language: str = "ja",
+        max_length: int = 5000,
+    ) -> Iterator[Tuple[str, Any]]:
+        """Stream long-form generation as (event, data) pairs.
+
+        Emits ``delta`` for every text chunk, ``post`` as soon as each post in
+        the JSON array is complete, then ``done`` with the same payload as
+        generate_long_form (or ``error`` on failure).
+        """
+        system_prompt, user_prompt = self._build_long_form_prompts(
+            genre, style, count, custom_prompt, persona, strategy, language, max_length,
+            stream=True,
         )
 
+        scanner = _JsonArrayStringScanner()
+        chunks: List[str] = []
         try:
-            response_text = self.call_llm(system_prompt, user_prompt, 4096)
-            posts = json.loads(response_text)
-            if not isinstance(posts, list):
-                raise ValueError("Response is not a list")
-            validated = [p for p in posts if isinstance(p, str)]
-            return {"posts": validated[:count], "post_format": "long_form"}
-        except json.JSONDecodeError:
+            max_tokens = _output_token_budget(max_length, count, language, 4096)
+            for text in self.stream_llm(system_prompt, user_prompt, max_tokens):
+                chunks.append(text)
+                yield "delta", text
+                for post in scanner.feed(text):
+                    yield "post", post
+            posts = orjson.loads("".join(chunks).strip())
+            yield "done", self._validate_long_form(posts, count)
+        except orjson.JSONDecodeError:
             logger.error("Failed to parse long-form response")
-            raise HTTPException(status_code=502, detail="AI returned invalid format.")
+            yield "error", {"detail": "AI returned invalid format."}
         except Exception as exc:
             logger.error("AI API error: %s", exc)
-            raise HTTPException(status_code=502, detail=f"AI API error: {exc}") from exc
+            yield "error", {"detail": f"AI API error: {getattr(exc, 'detail', exc)}"}
 
     def generate_thread(
         self,
@@ -266,8 +795,7 @@ class AIService:
         system_prompt = (
             "You are an expert X (Twitter) thread creator. "
             "Create compelling threads that tell a story or explain a topic step by step. "
-            f"Each tweet in the thread MUST be {max_length} characters or fewer. "
-            "Return ONLY a valid JSON object with key 'threads' containing an array of arrays of strings."
+            f"Each tweet in the thread MUST be {max_length} characters or fewer."
         )
         system_prompt += _build_language_instruction(language)
         system_prompt += self._build_persona_context(persona)
@@ -283,48 +811,47 @@ class AIService:
         if custom_prompt:
             user_prompt += f"\n\nAdditional instructions: {custom_prompt}"
 
-        user_prompt += (
-            f'\n\nReturn JSON: {{"threads": [["tweet1", "tweet2", ...], ...]}}'
-        )
-
         try:
-            response_text = self.call_llm(system_prompt, user_prompt, 4096)
-            result = json.loads(response_text)
+            max_tokens = _output_token_budget(
+                max_length, count * thread_length, language, 4096
+            )
+            result = self.call_llm_json(system_prompt, user_prompt, max_tokens, "return_threads")
             threads = result.get("threads", [])
-            validated_threads = []
-            for thread in threads[:count]:
-                validated_thread = []
-                for tweet in thread[:thread_length]:
-                    if isinstance(tweet, str) and len(tweet) <= max_length:
-                        validated_thread.append(tweet)
-                    elif isinstance(tweet, str):
-                        validated_thread.append(tweet[:max_length - 3] + "...")
-                if validated_thread:
-                    validated_threads.append(validated_thread)
+            validated_threads = [
+                validated_thread
+                for validated_thread in (
+                    [
+                        _truncate(tweet, max_length)
+                        for tweet in thread[:thread_length]
+                        if isinstance(tweet, str)
+                    ]
+                    for thread in threads[:count]
+                )
+                if validated_thread
+            ]
             first_thread_posts = validated_threads[0] if validated_threads else []
             return {
                 "posts": first_thread_posts,
                 "threads": validated_threads,
                 "post_format": "thread",
             }
-        except json.JSONDecodeError:
-            logger.error("Failed to parse thread response")
-            raise HTTPException(status_code=502, detail="AI returned invalid format.")
         except Exception as exc:
             logger.error("AI API error: %s", exc)
-            raise HTTPException(status_code=502, detail=f"AI API error: {exc}") from exc
+            raise _llm_http_error(exc) from exc
 
-    def improve_post(
+    def _build_improve_prompts(
         self,
         content: str,
-        feedback: Optional[str] = None,
-        language: str = "ja",
-        max_length: int = 280,
-    ) -> Dict[str, str]:
+        feedback: Optional[str],
+        language: str,
+        max_length: int,
+    ) -> Tuple[str, str]:
+        """Build the (system, user) prompt pair for post improvement."""
         system_prompt = (
             "You are an expert social media copywriter. "
             "Improve the given X (Twitter) post to maximize engagement. "
             f"The improved version MUST be {max_length} characters or fewer. "
+            "Keep the explanation to one sentence. "
             "Return ONLY valid JSON with keys: 'improved' and 'explanation'."
         )
         system_prompt += _build_language_instruction(language)
@@ -337,29 +864,67 @@ class AIService:
             "\n\nReturn JSON: "
             '{\"improved\": \"the improved post\", \"explanation\": \"why this is better\"}'
         )
+        return system_prompt, user_prompt
+
+    @staticmethod
+    def _validate_improvement(
+        content: str, result: Dict[str, Any], max_length: int
+    ) -> Dict[str, str]:
+        return {
+            "original": content,
+            "improved": _truncate(result.get("improved", content), max_length),
+            "explanation": result.get("explanation", "Improved for better engagement."),
+        }
+
+    def improve_post(
+        self,
+        content: str,
+        feedback: Optional[str] = None,
+        language: str = "ja",
+        max_length: int = 280,
+    ) -> Dict[str, str]:
+        system_prompt, user_prompt = self._build_improve_prompts(
+            content, feedback, language, max_length
+        )
 
         try:
-            response_text = self.call_llm(system_prompt, user_prompt, 512)
-            result = json.loads(response_text)
-            improved = result.get("improved", content)
-            if len(improved) > max_length:
-                improved = improved[:max_length - 3] + "..."
-            return {
-                "original": content,
-                "improved": improved,
-                "explanation": result.get("explanation", "Improved for better engagement."),
-            }
-        except (json.JSONDecodeError, KeyError):
+            max_tokens = _improve_token_budget(language, max_length)
+            result = self.call_llm_json(system_prompt, user_prompt, max_tokens, "return_improvement")
+            return self._validate_improvement(content, result, max_length)
+        except Exception as exc:
+            logger.error("AI API error: %s", exc)
+            raise _llm_http_error(exc) from exc
+
+    def stream_improve_post(
+        self,
+        content: str,
+        feedback: Optional[str] = None,
+        language: str = "ja",
+        max_length: int = 280,
+    ) -> Iterator[Tuple[str, Any]]:
+        """Stream post improvement as (event, data) pairs.
+
+        Emits ``delta`` for every text chunk, then ``done`` with the same
+        payload as improve_post (or ``error`` on failure).
+        """
+        system_prompt, user_prompt = self._build_improve_prompts(
+            content, feedback, language, max_length
+        )
+
+        chunks: List[str] = []
+        try:
+            max_tokens = _improve_token_budget(language, max_length)
+            for text in self.stream_llm(system_prompt, user_prompt, max_tokens):
+                chunks.append(text)
+                yield "delta", text
+            result = orjson.loads("".join(chunks).strip())
+            yield "done", self._validate_improvement(content, result, max_length)
+        except (orjson.JSONDecodeError, KeyError):
             logger.error("Failed to parse AI improvement response")
-            raise HTTPException(
-                status_code=502,
-                detail="AI returned an invalid response format.",
-            )
+            yield "error", {"detail": "AI returned an invalid response format."}
         except Exception as exc:
             logger.error("AI API error: %s", exc)
-            raise HTTPException(
-                status_code=502, detail=f"AI API error: {exc}"
-            ) from exc
+            yield "error", {"detail": f"AI API error: {getattr(exc, 'detail', exc)}"}
 
     def analyze_performance(
         self,
@@ -368,27 +933,25 @@ class AIService:
         system_prompt = (
             "You are a social media analytics expert. "
             "Analyze the provided X (Twitter) post performance data and provide "
-            "actionable insights and recommendations. "
-            "Return ONLY valid JSON with keys: 'analysis', 'top_performing', "
-            "'improvement_areas', 'recommendations'."
+            "actionable insights and recommendations."
         )
 
         user_prompt = (
             "Analyze these X post performance metrics:\n\n"
-            f"{json.dumps(metrics_data, indent=2)}\n\n"
+            f"{_compact_metrics_payload(metrics_data)}\n\n"
             "Provide analysis with:\n"
             "- Overall performance summary\n"
             "- Top performing content patterns\n"
             "- Areas for improvement\n"
             "- Specific, actionable recommendations\n\n"
-            "Return as JSON."
+            "Keep the summary to a short paragraph and each list item to one sentence."
         )
 
         try:
-            response_text = self.call_llm(system_prompt, user_prompt, 2048)
-            result = json.loads(response_text)
-            return result
-        except (json.JSONDecodeError, KeyError):
+            return self.call_llm_json(
+                system_prompt, user_prompt, 1024, "return_analysis", cache=True
+            )
+        except (ValueError, KeyError):
             logger.error("Failed to parse AI analysis response")
             return {
                 "analysis": "Unable to parse analysis. Please try again.",
@@ -398,9 +961,7 @@ class AIService:
             }
         except Exception as exc:
             logger.error("AI API error during analysis: %s", exc)
-            raise HTTPException(
-                status_code=502, detail=f"AI API error: {exc}"
-            ) from exc
+            raise _llm_http_error(exc) from exc
 
 
 def create_ai_service(db: Session, user_id: int) -> AIService:
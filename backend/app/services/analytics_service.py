@@ -1,16 +1,21 @@
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, time, timedelta
+from typing import Optional, List, Dict, Any, Iterator
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import case, desc, func, true
 
-from app.models.models import Post, PostAnalytics, PostStatus
+from app.models.models import DailyPostAnalytics, Post, PostAnalytics, PostStatus
+from app.services.prediction_service import invalidate_recent_metrics
 from app.services.x_api import XApiService, create_x_api_service
+from app.utils.dialect import dialect_insert
 
 logger = logging.getLogger(__name__)
 
+# Posts loaded and committed per round in collect_analytics
+COLLECT_PAGE_SIZE = 1000
+
 
 class AnalyticsService:
     def __init__(self, db: Session, user_id: Optional[int] = None) -> None:
@@ -23,24 +28,17 @@ class AnalyticsService:
     def get_overview(self, days: int = 30, user_id: Optional[int] = None) -> Dict[str, Any]:
         cutoff = datetime.utcnow() - timedelta(days=days)
 
-        total_posts_query = (
-            self.db.query(Post)
-            .filter(Post.status == PostStatus.posted)
-        )
-        if user_id is not None:
-            total_posts_query = total_posts_query.filter(Post.user_id == user_id)
-        total_posts = total_posts_query.count()
-
-        recent_posts_query = (
-            self.db.query(Post)
-            .filter(
-                Post.status == PostStatus.posted,
-                Post.posted_at >= cutoff,
+        # Post counts via conditional aggregation
+        post_counts_query = (
+            self.db.query(
+                func.count(Post.id).label("total_posts"),
+                func.count(case((Post.posted_at >= cutoff, 1))).label("recent_posts"),
             )
+            .filter(Post.status == PostStatus.posted)
         )
         if user_id is not None:
-            recent_posts_query = recent_posts_query.filter(Post.user_id == user_id)
-        recent_posts = recent_posts_query.count()
+            post_counts_query = post_counts_query.filter(Post.user_id == user_id)
+        post_counts = post_counts_query.subquery()
 
         # Aggregate analytics for the period
         analytics_query = (
@@ -58,59 +56,73 @@ class AnalyticsService:
         )
         if user_id is not None:
             analytics_query = analytics_query.join(Post, PostAnalytics.post_id == Post.id).filter(Post.user_id == user_id)
-        analytics = analytics_query.first()
+        analytics_totals = analytics_query.subquery()
+
+        # Both sides are single-row aggregates: fetch them in one round-trip
+        row = (
+            self.db.query(
+                post_counts.c.total_posts,
+                post_counts.c.recent_posts,
+                *analytics_totals.c,
+            )
+            .select_from(post_counts)
+            .join(analytics_totals, true())
+            .one()
+        )
 
         return {
             "period_days": days,
-            "total_posts": total_posts,
-            "recent_posts": recent_posts,
-            "total_impressions": analytics.total_impressions or 0,
-            "total_likes": analytics.total_likes or 0,
-            "total_retweets": analytics.total_retweets or 0,
-            "total_replies": analytics.total_replies or 0,
-            "total_quotes": analytics.total_quotes or 0,
-            "total_bookmarks": analytics.total_bookmarks or 0,
-            "avg_impressions": round(float(analytics.avg_impressions or 0), 1),
-            "avg_likes": round(float(analytics.avg_likes or 0), 1),
+            "total_posts": row.total_posts or 0,
+            "recent_posts": row.recent_posts or 0,
+            "total_impressions": row.total_impressions or 0,
+            "total_likes": row.total_likes or 0,
+            "total_retweets": row.total_retweets or 0,
+            "total_replies": row.total_replies or 0,
+            "total_quotes": row.total_quotes or 0,
+            "total_bookmarks": row.total_bookmarks or 0,
+            "avg_impressions": round(float(row.avg_impressions or 0), 1),
+            "avg_likes": round(float(row.avg_likes or 0), 1),
         }
 
     def get_post_analytics(self, post_id: int, user_id: Optional[int] = None) -> List[PostAnalytics]:
-        post_query = self.db.query(Post).filter(Post.id == post_id)
+        # Scope the analytics to the owner with a join; the post only needs a
+        # separate existence check when no analytics come back
+        analytics_query = self.db.query(PostAnalytics).filter(PostAnalytics.post_id == post_id)
+        if user_id is not None:
+            analytics_query = analytics_query.join(Post, PostAnalytics.post_id == Post.id).filter(Post.user_id == user_id)
+        analytics = analytics_query.order_by(desc(PostAnalytics.collected_at)).all()
+        if analytics:
+            return analytics
+
+        post_query = self.db.query(Post.id).filter(Post.id == post_id)
         if user_id is not None:
             post_query = post_query.filter(Post.user_id == user_id)
-        post = post_query.first()
-        if not post:
+        if not self.db.query(post_query.exists()).scalar():
             raise HTTPException(status_code=404, detail=f"Post {post_id} not found.")
-
-        analytics = (
-            self.db.query(PostAnalytics)
-            .filter(PostAnalytics.post_id == post_id)
-            .order_by(desc(PostAnalytics.collected_at))
-            .all()
-        )
         return analytics
 
     def get_trends(self, days: int = 30, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        cutoff = datetime.utcnow() - timedelta(days=days)
+        since = (datetime.utcnow() - timedelta(days=days)).date()
 
-        # Get daily aggregated metrics
+        # Read the daily rollup (at most `days` rows per user) instead of
+        # aggregating post_analytics on every request
         daily_metrics_query = (
             self.db.query(
-                func.date(PostAnalytics.collected_at).label("date"),
-                func.sum(PostAnalytics.impressions).label("impressions"),
-                func.sum(PostAnalytics.likes).label("likes"),
-                func.sum(PostAnalytics.retweets).label("retweets"),
-                func.sum(PostAnalytics.replies).label("replies"),
-                func.count(PostAnalytics.id).label("posts_tracked"),
+                DailyPostAnalytics.date,
+                func.sum(DailyPostAnalytics.impressions).label("impressions"),
+                func.sum(DailyPostAnalytics.likes).label("likes"),
+                func.sum(DailyPostAnalytics.retweets).label("retweets"),
+                func.sum(DailyPostAnalytics.replies).label("replies"),
+                func.sum(DailyPostAnalytics.posts_tracked).label("posts_tracked"),
             )
-            .filter(PostAnalytics.collected_at >= cutoff)
+            .filter(DailyPostAnalytics.date >= since)
         )
         if user_id is not None:
-            daily_metrics_query = daily_metrics_query.join(Post, PostAnalytics.post_id == Post.id).filter(Post.user_id == user_id)
+            daily_metrics_query = daily_metrics_query.filter(DailyPostAnalytics.user_id == user_id)
         daily_metrics = (
             daily_metrics_query
-            .group_by(func.date(PostAnalytics.collected_at))
-            .order_by(func.date(PostAnalytics.collected_at))
+            .group_by(DailyPostAnalytics.date)
+            .order_by(DailyPostAnalytics.date)
             .all()
         )
 
@@ -131,7 +143,7 @@ class AnalyticsService:
     def collect_analytics(self, user_id: Optional[int] = None) -> Dict[str, Any]:
         # Collect analytics for all posted tweets
         posted_posts_query = (
-            self.db.query(Post)
+            self.db.query(Post.id, Post.x_tweet_id)
             .filter(
                 Post.status == PostStatus.posted,
                 Post.x_tweet_id.isnot(None),
@@ -139,38 +151,140 @@ class AnalyticsService:
         )
         if user_id is not None:
             posted_posts_query = posted_posts_query.filter(Post.user_id == user_id)
-        posted_posts = posted_posts_query.all()
 
+        # Walk the posts in id-ordered pages so memory stays bounded by the
+        # page size; each page is committed before the next one is read.
+        # Within a page, batches are written while the remaining lookups are
+        # still in flight.
+        started = datetime.utcnow()
+        total_posts = 0
         collected = 0
-        errors = 0
-        for post in posted_posts:
-            try:
-                metrics = self.x_api.get_tweet_metrics(post.x_tweet_id)
-                analytics = PostAnalytics(
-                    post_id=post.id,
-                    impressions=metrics.get("impressions", 0),
-                    likes=metrics.get("likes", 0),
-                    retweets=metrics.get("retweets", 0),
-                    replies=metrics.get("replies", 0),
-                    quotes=metrics.get("quotes", 0),
-                    bookmarks=metrics.get("bookmarks", 0),
-                    profile_visits=metrics.get("profile_visits", 0),
-                    collected_at=datetime.utcnow(),
-                )
-                self.db.add(analytics)
-                collected += 1
-            except HTTPException as exc:
-                logger.warning(
-                    "Failed to collect analytics for post %d: %s",
-                    post.id,
-                    exc.detail,
-                )
-                errors += 1
-
-        self.db.commit()
+        last_id = 0
+        while True:
+            page = (
+                posted_posts_query
+                .filter(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(COLLECT_PAGE_SIZE)
+                .all()
+            )
+            if not page:
+                break
+            for rows in iter_analytics_rows(self.x_api, page):
+                if rows:
+                    self.db.bulk_insert_mappings(PostAnalytics, rows)
+                    collected += len(rows)
+            self.db.commit()
+            total_posts += len(page)
+            if len(page) < COLLECT_PAGE_SIZE:
+                break
+            last_id = page[-1].id
+        if collected:
+            refresh_daily_analytics(self.db, started.date(), user_id=user_id)
+            self.db.commit()
+            invalidate_recent_metrics()
+
+        errors = total_posts - collected
         logger.info("Collected analytics: %d succeeded, %d failed", collected, errors)
         return {
             "collected": collected,
             "errors": errors,
-            "total_posts": len(posted_posts),
+            "total_posts": total_posts,
         }
+
+
+def iter_analytics_rows(x_api: XApiService, posts) -> Iterator[List[Dict[str, Any]]]:
+    """Yield PostAnalytics mappings for (id, x_tweet_id) post rows, one list per
+    lookup batch as it completes.
+
+    Posts whose metrics could not be fetched are left out of the result.
+    """
+    if not posts:
+        return
+    post_ids_by_tweet = {p.x_tweet_id: p.id for p in posts}
+    try:
+        for metrics_by_tweet in x_api.iter_tweets_metrics(list(post_ids_by_tweet)):
+            collected_at = datetime.utcnow()
+            yield [
+                {
+                    "post_id": post_ids_by_tweet[tweet_id],
+                    "impressions": metrics.get("impressions", 0),
+                    "likes": metrics.get("likes", 0),
+                    "retweets": metrics.get("retweets", 0),
+                    "replies": metrics.get("replies", 0),
+                    "quotes": metrics.get("quotes", 0),
+                    "bookmarks": metrics.get("bookmarks", 0),
+                    "profile_visits": metrics.get("profile_visits", 0),
+                    "collected_at": collected_at,
+                }
+                for tweet_id, metrics in metrics_by_tweet.items()
+                if tweet_id in post_ids_by_tweet
+            ]
+    except HTTPException as exc:
+        logger.warning(
+            "Failed to collect analytics for %d posts: %s", len(posts), exc.detail
+        )
+
+
+def backfill_daily_analytics(db: Session) -> None:
+    """Build daily_post_analytics for history it is missing; run at startup.
+
+    Deployments create tables with create_all rather than migrating, so the
+    backfill in migration 006 never ran there. If the rollup starts later
+    than the earliest snapshot (or is empty), everything from that snapshot
+    onwards is rebuilt. Commits.
+    """
+    first_snapshot = db.query(func.min(PostAnalytics.collected_at)).scalar()
+    if first_snapshot is None:
+        return
+    first_day = db.query(func.min(DailyPostAnalytics.date)).scalar()
+    if first_day is not None and first_day <= first_snapshot.date():
+        return
+    refresh_daily_analytics(db, first_snapshot.date())
+    db.commit()
+    logger.info("Backfilled daily analytics from %s", first_snapshot.date())
+
+
+def refresh_daily_analytics(
+    db: Session, since: date, user_id: Optional[int] = None
+) -> None:
+    """Rebuild daily_post_analytics rows from `since` onwards.
+
+    post_analytics only grows through collection, so callers refresh the
+    days they just wrote to. Rows are upserted, so concurrent refreshes of
+    the same days don't conflict. The caller commits.
+    """
+    stale = db.query(DailyPostAnalytics).filter(DailyPostAnalytics.date >= since)
+    if user_id is not None:
+        stale = stale.filter(DailyPostAnalytics.user_id == user_id)
+    stale.delete(synchronize_session=False)
+
+    day = func.date(PostAnalytics.collected_at)
+    rollup = (
+        db.query(
+            Post.user_id,
+            day,
+            func.coalesce(func.sum(PostAnalytics.impressions), 0),
+            func.coalesce(func.sum(PostAnalytics.likes), 0),
+            func.coalesce(func.sum(PostAnalytics.retweets), 0),
+            func.coalesce(func.sum(PostAnalytics.replies), 0),
+            func.count(PostAnalytics.id),
+        )
+        .join(Post, PostAnalytics.post_id == Post.id)
+        .filter(PostAnalytics.collected_at >= datetime.combine(since, time.min))
+    )
+    if user_id is not None:
+        rollup = rollup.filter(Post.user_id == user_id)
+    rollup = rollup.group_by(Post.user_id, day)
+
+    columns = ["user_id", "date", "impressions", "likes", "retweets", "replies", "posts_tracked"]
+    stmt = dialect_insert(db)(DailyPostAnalytics).from_select(columns, rollup)
+    # Upsert rather than plain INSERT: a concurrent refresh of the same days
+    # (user-triggered collection vs. the scheduled job) would otherwise hit
+    # the (user_id, date) unique constraint and roll back the collection
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "date"],
+            set_={column: stmt.excluded[column] for column in columns[2:]},
+        )
+    )
@@ -1,9 +1,10 @@
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 
 from sqlalchemy.orm import Session
 
 from app.models.models import AppSetting
+from app.services.user_settings import get_raw_user_settings, invalidate_user_settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +28,31 @@ class AutoPilotService:
         return self.get_setting("auto_pilot_enabled", user_id=user_id) == "true"
 
     def get_setting(self, key: str, user_id: Optional[int] = None) -> str:
-        query = (
-            self.db.query(AppSetting)
-            .filter(AppSetting.key == key)
-        )
+        return self.get_settings((key,), user_id=user_id)[key]
+
+    def get_settings(self, keys: Iterable[str], user_id: Optional[int] = None) -> Dict[str, str]:
+        """Read several settings in one query, falling back to DEFAULT_SETTINGS.
+
+        Per-user reads go through the shared user_settings cache, which every
+        AppSetting writer invalidates.
+        """
+        keys = list(keys)
         if user_id is not None:
-            query = query.filter(AppSetting.user_id == user_id)
-        setting = query.first()
-        if setting:
-            return setting.value
-        return DEFAULT_SETTINGS.get(key, "")
+            stored = get_raw_user_settings(self.db, user_id, keys)
+        else:
+            stored = {}
+            for key, value in (
+                self.db.query(AppSetting.key, AppSetting.value)
+                .filter(AppSetting.key.in_(keys))
+                .all()
+            ):
+                # Keep the first row per key, as an unscoped .first() would
+                stored.setdefault(key, value)
+        values: Dict[str, str] = {}
+        for key in keys:
+            value = stored.get(key)
+            values[key] = value if value is not None else DEFAULT_SETTINGS.get(key, "")
+        return values
 
     def set_setting(self, key: str, value: str, user_id: Optional[int] = None) -> None:
         query = (
@@ -53,18 +69,19 @@ class AutoPilotService:
             setting.user_id = user_id
             self.db.add(setting)
         self.db.commit()
+        if user_id is not None:
+            invalidate_user_settings(user_id)
 
     def get_status(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        values = self.get_settings(DEFAULT_SETTINGS, user_id=user_id)
         return {
-            "enabled": self.get_setting("auto_pilot_enabled", user_id=user_id) == "true",
-            "auto_post_enabled": self.get_setting("auto_post_enabled", user_id=user_id) == "true",
-            "auto_post_count": int(self.get_setting("auto_post_count", user_id=user_id) or "3"),
-            "auto_post_with_image": self.get_setting("auto_post_with_image", user_id=user_id) == "true",
-            "auto_follow_enabled": self.get_setting("auto_follow_enabled", user_id=user_id) == "true",
-            "auto_follow_keywords": self.get_setting("auto_follow_keywords", user_id=user_id),
-            "auto_follow_daily_limit": int(
-                self.get_setting("auto_follow_daily_limit", user_id=user_id) or "10"
-            ),
+            "enabled": values["auto_pilot_enabled"] == "true",
+            "auto_post_enabled": values["auto_post_enabled"] == "true",
+            "auto_post_count": int(values["auto_post_count"] or "3"),
+            "auto_post_with_image": values["auto_post_with_image"] == "true",
+            "auto_follow_enabled": values["auto_follow_enabled"] == "true",
+            "auto_follow_keywords": values["auto_follow_keywords"],
+            "auto_follow_daily_limit": int(values["auto_follow_daily_limit"] or "10"),
         }
 
     def toggle(self, user_id: Optional[int] = None) -> Dict[str, Any]:
@@ -83,10 +100,30 @@ class AutoPilotService:
             "auto_follow_keywords": "auto_follow_keywords",
             "auto_follow_daily_limit": "auto_follow_daily_limit",
         }
+        updates: Dict[str, str] = {}
         for field, key in field_map.items():
             if field in settings:
                 value = settings[field]
                 if isinstance(value, bool):
                     value = "true" if value else "false"
-                self.set_setting(key, str(value), user_id=user_id)
+                updates[key] = str(value)
+        if updates:
+            # Load the existing rows once, then write everything in one commit
+            query = self.db.query(AppSetting).filter(AppSetting.key.in_(updates))
+            if user_id is not None:
+                query = query.filter(AppSetting.user_id == user_id)
+            existing: Dict[str, AppSetting] = {}
+            for setting in query.all():
+                existing.setdefault(setting.key, setting)
+            for key, value in updates.items():
+                setting = existing.get(key)
+                if setting:
+                    setting.value = value
+                else:
+                    setting = AppSetting(key=key, value=value, category="auto_pilot")
+                    setting.user_id = user_id
+                    self.db.add(setting)
+            self.db.commit()
+            if user_id is not None:
+                invalidate_user_settings(user_id)
         return self.get_status(user_id=user_id)
@@ -1,17 +1,26 @@
 import logging
+import time
 from datetime import datetime
 from typing import Optional, List, Tuple, Dict, Any
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, case, desc, func, or_, update
 
 from app.models.models import FollowTarget, FollowAction, FollowStatus
 from app.schemas.schemas import FollowTargetCreate
 from app.services.x_api import XApiService, create_x_api_service
+from app.utils.dialect import dialect_insert
+from app.utils.enums import enum_map, lookup_enum
 
 logger = logging.getLogger(__name__)
 
+_FOLLOW_STATUSES = enum_map(FollowStatus)
+_FOLLOW_ACTIONS = enum_map(FollowAction)
+
+# Targets executed between status writes in execute_follows_batch
+_FOLLOW_RECORD_EVERY = 10
+
 
 class FollowService:
     def __init__(self, db: Session, user_id: Optional[int] = None) -> None:
@@ -28,45 +37,64 @@ class FollowService:
         status: Optional[str] = None,
         action: Optional[str] = None,
         user_id: Optional[int] = None,
-    ) -> Tuple[List[FollowTarget], int]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[FollowTarget], Optional[str]]:
+        """Return a page of targets, newest first, and the cursor for the next page.
+
+        Pass the returned cursor back to continue after the last row via a
+        keyset filter on (created_at, id); skip is only applied without one.
+        The next cursor is None on the last page.
+        """
         query = self.db.query(FollowTarget)
         if user_id is not None:
             query = query.filter(FollowTarget.user_id == user_id)
         if status:
-            query = query.filter(FollowTarget.status == FollowStatus(status))
+            query = query.filter(FollowTarget.status == lookup_enum(_FOLLOW_STATUSES, status, "status"))
         if action:
-            query = query.filter(FollowTarget.action == FollowAction(action))
-        total = query.count()
-        targets = (
-            query.order_by(desc(FollowTarget.created_at))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return targets, total
+            query = query.filter(FollowTarget.action == lookup_enum(_FOLLOW_ACTIONS, action, "action"))
+        if cursor:
+            created_at, target_id = _decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    FollowTarget.created_at < created_at,
+                    and_(FollowTarget.created_at == created_at, FollowTarget.id < target_id),
+                )
+            )
+        query = query.order_by(desc(FollowTarget.created_at), desc(FollowTarget.id))
+        if not cursor:
+            query = query.offset(skip)
+        # One extra row tells whether another page exists, without a count()
+        targets = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(targets) > limit:
+            targets = targets[:limit]
+            last = targets[-1]
+            next_cursor = f"{last.created_at.isoformat()}_{last.id}"
+        return targets, next_cursor
 
     def create_follow_target(self, data: FollowTargetCreate, user_id: Optional[int] = None) -> FollowTarget:
-        existing = (
-            self.db.query(FollowTarget)
-            .filter(FollowTarget.x_user_id == data.x_user_id)
-            .first()
+        # Single INSERT ... ON CONFLICT DO NOTHING RETURNING: no SELECT
+        # beforehand and no race between two requests adding the same user
+        insert = dialect_insert(self.db)
+        stmt = (
+            insert(FollowTarget)
+            .values(
+                user_id=user_id,
+                x_user_id=data.x_user_id,
+                x_username=data.x_username,
+                action=lookup_enum(_FOLLOW_ACTIONS, data.action, "action") if data.action else FollowAction.follow,
+                status=FollowStatus.pending,
+            )
+            .on_conflict_do_nothing(index_elements=["x_user_id"])
+            .returning(FollowTarget)
         )
-        if existing:
+        target = self.db.execute(stmt).scalar_one_or_none()
+        if target is None:
             raise HTTPException(
                 status_code=400,
                 detail=f"User {data.x_user_id} is already in the follow targets list.",
             )
-
-        target = FollowTarget(
-            x_user_id=data.x_user_id,
-            x_username=data.x_username,
-            action=FollowAction(data.action) if data.action else FollowAction.follow,
-            status=FollowStatus.pending,
-        )
-        target.user_id = user_id
-        self.db.add(target)
         self.db.commit()
-        self.db.refresh(target)
         logger.info(
             "Created follow target id=%d user=%s", target.id, target.x_username
         )
@@ -99,46 +127,129 @@ class FollowService:
                 target.unfollowed_at = datetime.utcnow()
 
             target.status = FollowStatus.completed
-            self.db.commit()
-            self.db.refresh(target)
             logger.info(
                 "Executed %s for target id=%d user=%s",
                 target.action.value,
                 target.id,
                 target.x_username,
             )
+            self.db.commit()
             return target
         except HTTPException:
             target.status = FollowStatus.failed
             self.db.commit()
-            self.db.refresh(target)
             raise
 
-    def get_follow_stats(self, user_id: Optional[int] = None) -> Dict[str, int]:
-        base_query = self.db.query(FollowTarget)
-        if user_id is not None:
-            base_query = base_query.filter(FollowTarget.user_id == user_id)
-        total = base_query.count()
-        pending = (
-            base_query.filter(FollowTarget.status == FollowStatus.pending)
-            .count()
-        )
-        completed = (
-            base_query.filter(FollowTarget.status == FollowStatus.completed)
-            .count()
+    def execute_follows_batch(
+        self,
+        target_ids: List[int],
+        user_id: Optional[int] = None,
+        pause_seconds: float = 0.0,
+    ) -> Dict[str, int]:
+        """Execute many follow targets, recording outcomes in batched UPDATEs.
+
+        X API calls stay sequential, with pause_seconds between them, to
+        respect X's follow pacing; only the status bookkeeping is batched.
+        Outcomes are written every _FOLLOW_RECORD_EVERY targets and on the
+        way out, so a crash mid-run loses at most one chunk of them.
+        """
+        query = self.db.query(FollowTarget.id, FollowTarget.x_user_id, FollowTarget.action).filter(
+            FollowTarget.id.in_(target_ids),
+            FollowTarget.status != FollowStatus.completed,
         )
-        failed = (
-            base_query.filter(FollowTarget.status == FollowStatus.failed)
-            .count()
+        if user_id is not None:
+            query = query.filter(FollowTarget.user_id == user_id)
+        targets = query.all()
+
+        completed = failed = 0
+        statuses: Dict[int, FollowStatus] = {}
+        followed_at: Dict[int, datetime] = {}
+        unfollowed_at: Dict[int, datetime] = {}
+        try:
+            for i, target in enumerate(targets):
+                if i and pause_seconds:
+                    time.sleep(pause_seconds)
+                try:
+                    if target.action == FollowAction.follow:
+                        self.x_api.follow_user(target.x_user_id)
+                        followed_at[target.id] = datetime.utcnow()
+                    else:
+                        self.x_api.unfollow_user(target.x_user_id)
+                        unfollowed_at[target.id] = datetime.utcnow()
+                    statuses[target.id] = FollowStatus.completed
+                    completed += 1
+                except Exception as exc:
+                    # Includes raw connection errors from requests/tweepy,
+                    # which must not abort the rest of the batch
+                    logger.warning(
+                        "Follow target id=%d failed: %s",
+                        target.id, getattr(exc, "detail", exc),
+                    )
+                    statuses[target.id] = FollowStatus.failed
+                    failed += 1
+                if len(statuses) >= _FOLLOW_RECORD_EVERY:
+                    self._record_follow_results(statuses, followed_at, unfollowed_at)
+        finally:
+            self._record_follow_results(statuses, followed_at, unfollowed_at)
+
+        logger.info("Executed %d follow targets: %d completed", completed + failed, completed)
+        return {"completed": completed, "failed": failed}
+
+    def _record_follow_results(
+        self,
+        statuses: Dict[int, FollowStatus],
+        followed_at: Dict[int, datetime],
+        unfollowed_at: Dict[int, datetime],
+    ) -> None:
+        """Write the collected outcomes in one CASE UPDATE, then clear them."""
+        if not statuses:
+            return
+        values: Dict[str, Any] = {
+            "status": case(statuses, value=FollowTarget.id),
+        }
+        if followed_at:
+            values["followed_at"] = case(
+                followed_at, value=FollowTarget.id, else_=FollowTarget.followed_at
+            )
+        if unfollowed_at:
+            values["unfollowed_at"] = case(
+                unfollowed_at, value=FollowTarget.id, else_=FollowTarget.unfollowed_at
+            )
+        self.db.execute(
+            update(FollowTarget)
+            .where(FollowTarget.id.in_(statuses))
+            .values(**values)
+            .execution_options(synchronize_session=False)
         )
-        follow_backs = (
-            base_query.filter(FollowTarget.follow_back == True)
-            .count()
+        self.db.commit()
+        statuses.clear()
+        followed_at.clear()
+        unfollowed_at.clear()
+
+    def get_follow_stats(self, user_id: Optional[int] = None) -> Dict[str, int]:
+        # All buckets in one scan via conditional aggregation
+        stats_query = self.db.query(
+            func.count(FollowTarget.id).label("total"),
+            func.count(case((FollowTarget.status == FollowStatus.pending, 1))).label("pending"),
+            func.count(case((FollowTarget.status == FollowStatus.completed, 1))).label("completed"),
+            func.count(case((FollowTarget.status == FollowStatus.failed, 1))).label("failed"),
+            func.count(case((FollowTarget.follow_back == True, 1))).label("follow_backs"),
         )
+        if user_id is not None:
+            stats_query = stats_query.filter(FollowTarget.user_id == user_id)
+        row = stats_query.one()
         return {
-            "total_targets": total,
-            "pending": pending,
-            "completed": completed,
-            "failed": failed,
-            "follow_backs": follow_backs,
+            "total_targets": row.total,
+            "pending": row.pending,
+            "completed": row.completed,
+            "failed": row.failed,
+            "follow_backs": row.follow_backs,
         }
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, target_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(target_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
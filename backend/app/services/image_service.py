@@ -1,25 +1,34 @@
 import logging
 import tempfile
 import os
+import threading
 from typing import Optional
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# One Gemini client per process so every ImageService shares its connection pool
+_genai_client = None
+_genai_client_lock = threading.Lock()
+
+
+def _get_genai_client():
+    global _genai_client
+    if _genai_client is None:
+        with _genai_client_lock:
+            if _genai_client is None:
+                from google import genai
+                _genai_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    return _genai_client
+
 
 class ImageService:
     """Generate images using Google Gemini API (Nano Banana Pro)."""
 
-    def __init__(self) -> None:
-        self._client = None
-
     @property
     def client(self):
-        if self._client is None:
-            from google import genai
-            self._client = genai.Client(api_key=settings.GEMINI_API_KEY)
-        return self._client
+        return _get_genai_client()
 
     def generate_image(self, prompt: str) -> Optional[str]:
         """Generate an image from a text prompt.
@@ -46,9 +55,14 @@ class ImageService:
                     mime_type = part.inline_data.mime_type or "image/png"
                     ext = ".png" if "png" in mime_type else ".jpg"
 
-                    # Save to temp file
-                    fd, filepath = tempfile.mkstemp(suffix=ext, prefix="xap_img_")
-                    with os.fdopen(fd, "wb") as f:
+                    # Save to temp file; the payload is written straight from
+                    # the response buffer without an extra copy
+                    fd, filepath = tempfile.mkstemp(
+                        suffix=ext,
+                        prefix="xap_img_",
+                        dir=settings.IMAGE_TMP_DIR or None,
+                    )
+                    with os.fdopen(fd, "wb", buffering=0) as f:
                         f.write(image_data)
 
                     logger.info("Image generated: %s (%d bytes)", filepath, len(image_data))
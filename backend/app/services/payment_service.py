@@ -1,9 +1,11 @@
+import functools
 import logging
 
 import stripe
 from fastapi import HTTPException
 
 from app.config import settings
+from app.database import SessionLocal
 from app.models.models import User, UserRole, SubscriptionTier
 
 logger = logging.getLogger(__name__)
@@ -14,16 +16,16 @@ TIER_PRICE_MAP = {
     "enterprise": lambda: settings.STRIPE_ENTERPRISE_PRICE_ID,
 }
 
-PRICE_TO_TIER = {}
-
-
+@functools.lru_cache(maxsize=1)
 def _init_stripe():
+    # Settings are fixed for the process lifetime, so configure the SDK once
     if settings.STRIPE_SECRET_KEY:
         stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
+@functools.lru_cache(maxsize=1)
 def _get_price_to_tier_map():
-    """Build reverse mapping from price_id to tier."""
+    """Reverse mapping from price_id to tier, built on first use."""
     return {
         settings.STRIPE_BASIC_PRICE_ID: SubscriptionTier.basic,
         settings.STRIPE_PRO_PRICE_ID: SubscriptionTier.pro,
@@ -51,24 +53,23 @@ def create_checkout_session(user: User, tier: str, success_url: str, cancel_url:
             detail=f"Stripe price ID not configured for tier: {tier}",
         )
 
-    # Create or get Stripe customer
-    if not user.stripe_customer_id:
-        customer = stripe.Customer.create(
-            email=user.email,
-            name=user.name,
-            metadata={"user_id": str(user.id)},
-        )
-        customer_id = customer.id
+    # First-time subscribers get their customer created by Checkout itself;
+    # the subscription carries the user id so its events can find the user
+    # even if they arrive before checkout.session.completed
+    if user.stripe_customer_id:
+        customer_kwargs = {"customer": user.stripe_customer_id}
     else:
-        customer_id = user.stripe_customer_id
+        customer_kwargs = {"customer_email": user.email}
 
     session = stripe.checkout.Session.create(
-        customer=customer_id,
+        **customer_kwargs,
         mode="subscription",
         line_items=[{"price": price_id, "quantity": 1}],
         success_url=success_url,
         cancel_url=cancel_url,
+        client_reference_id=str(user.id),
         metadata={"user_id": str(user.id), "tier": tier},
+        subscription_data={"metadata": {"user_id": str(user.id)}},
     )
 
     return session.url
@@ -91,7 +92,12 @@ def create_portal_session(user: User, return_url: str) -> str:
     return session.url
 
 
-def handle_webhook_event(payload: bytes, sig_header: str, db) -> dict:
+def handle_webhook_event(payload: bytes, sig_header: str) -> dict:
+    """Verify a Stripe event and apply its DB updates before acknowledging.
+
+    Runs in the worker threadpool with its own session. A handler failure
+    becomes a 500 so Stripe redelivers the event instead of dropping it.
+    """
     _init_stripe()
 
     try:
@@ -103,19 +109,25 @@ def handle_webhook_event(payload: bytes, sig_header: str, db) -> dict:
     except stripe.error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    event_type = event["type"]
-    data = event["data"]["object"]
-
-    if event_type == "checkout.session.completed":
-        _handle_checkout_completed(data, db)
-    elif event_type == "customer.subscription.updated":
-        _handle_subscription_updated(data, db)
-    elif event_type == "customer.subscription.deleted":
-        _handle_subscription_deleted(data, db)
+    handler = _EVENT_HANDLERS.get(event["type"])
+    if handler is not None:
+        _run_event_handler(handler, event["data"]["object"])
 
     return {"status": "ok"}
 
 
+def _run_event_handler(handler, data: dict) -> None:
+    db = SessionLocal()
+    try:
+        handler(data, db)
+    except Exception:
+        logger.exception("Stripe webhook handler %s failed", handler.__name__)
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Webhook handling failed")
+    finally:
+        db.close()
+
+
 def _handle_checkout_completed(session_data: dict, db):
     user_id = session_data.get("metadata", {}).get("user_id")
     tier = session_data.get("metadata", {}).get("tier")
@@ -139,6 +151,28 @@ def _handle_checkout_completed(session_data: dict, db):
     logger.info("Checkout completed for user %s, tier=%s", user_id, tier)
 
 
+def _find_subscription_user(subscription_data: dict, db):
+    """Look up a subscription's user by customer id, else by its metadata.
+
+    A first-time subscriber's customer id is only stored once
+    checkout.session.completed is handled, so earlier subscription events
+    fall back to the user_id set at checkout and link the customer here.
+    """
+    customer_id = subscription_data.get("customer")
+    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    if user:
+        return user
+
+    user_id = (subscription_data.get("metadata") or {}).get("user_id")
+    if not user_id:
+        return None
+    user = db.query(User).filter(User.id == int(user_id)).first()
+    if user:
+        user.stripe_customer_id = customer_id
+        user.stripe_subscription_id = subscription_data.get("id")
+    return user
+
+
 def _handle_subscription_updated(subscription_data: dict, db):
     customer_id = subscription_data.get("customer")
     price_id = None
@@ -146,24 +180,24 @@ def _handle_subscription_updated(subscription_data: dict, db):
     if items:
         price_id = items[0].get("price", {}).get("id")
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = _find_subscription_user(subscription_data, db)
     if not user:
         logger.warning("User not found for customer %s", customer_id)
         return
 
-    if price_id:
-        price_tier_map = _get_price_to_tier_map()
-        new_tier = price_tier_map.get(price_id)
-        if new_tier:
-            user.subscription_tier = new_tier
-            db.commit()
-            logger.info("Subscription updated for user %s, tier=%s", user.id, new_tier.value)
+    new_tier = _get_price_to_tier_map().get(price_id) if price_id else None
+    if new_tier:
+        user.subscription_tier = new_tier
+    # Also saves a customer id linked by _find_subscription_user
+    db.commit()
+    if new_tier:
+        logger.info("Subscription updated for user %s, tier=%s", user.id, new_tier.value)
 
 
 def _handle_subscription_deleted(subscription_data: dict, db):
     customer_id = subscription_data.get("customer")
 
-    user = db.query(User).filter(User.stripe_customer_id == customer_id).first()
+    user = _find_subscription_user(subscription_data, db)
     if not user:
         logger.warning("User not found for customer %s", customer_id)
         return
@@ -172,3 +206,10 @@ def _handle_subscription_deleted(subscription_data: dict, db):
     user.stripe_subscription_id = None
     db.commit()
     logger.info("Subscription deleted for user %s, reverted to free", user.id)
+
+
+_EVENT_HANDLERS = {
+    "checkout.session.completed": _handle_checkout_completed,
+    "customer.subscription.updated": _handle_subscription_updated,
+    "customer.subscription.deleted": _handle_subscription_deleted,
+}
@@ -13,9 +13,12 @@ from app.models.models import (
     AnalysisType,
 )
 from app.services.ai_service import AIService, create_ai_service
+from app.utils.enums import enum_map
 
 logger = logging.getLogger(__name__)
 
+_ANALYSIS_TYPES = enum_map(AnalysisType)
+
 
 class PdcaService:
     def __init__(self, db: Session, user_id: Optional[int] = None) -> None:
@@ -81,8 +84,21 @@ class PdcaService:
         period_start: datetime,
         period_end: datetime,
     ) -> List[Dict[str, Any]]:
-        results = (
-            self.db.query(Post, PostAnalytics)
+        # Select plain columns: the rows go straight into dicts, so ORM
+        # instances and identity-map bookkeeping would be wasted work
+        rows = (
+            self.db.query(
+                Post.id,
+                Post.content,
+                Post.post_type,
+                Post.posted_at,
+                PostAnalytics.impressions,
+                PostAnalytics.likes,
+                PostAnalytics.retweets,
+                PostAnalytics.replies,
+                PostAnalytics.quotes,
+                PostAnalytics.bookmarks,
+            )
             .join(PostAnalytics, Post.id == PostAnalytics.post_id)
             .filter(
                 Post.status == PostStatus.posted,
@@ -92,23 +108,21 @@ class PdcaService:
             .all()
         )
 
-        metrics_data = []
-        for post, analytics in results:
-            metrics_data.append(
-                {
-                    "post_id": post.id,
-                    "content": post.content,
-                    "post_type": post.post_type.value if post.post_type else "original",
-                    "posted_at": post.posted_at.isoformat() if post.posted_at else None,
-                    "impressions": analytics.impressions,
-                    "likes": analytics.likes,
-                    "retweets": analytics.retweets,
-                    "replies": analytics.replies,
-                    "quotes": analytics.quotes,
-                    "bookmarks": analytics.bookmarks,
-                }
-            )
-        return metrics_data
+        return [
+            {
+                "post_id": row.id,
+                "content": row.content,
+                "post_type": row.post_type.value if row.post_type else "original",
+                "posted_at": row.posted_at.isoformat() if row.posted_at else None,
+                "impressions": row.impressions,
+                "likes": row.likes,
+                "retweets": row.retweets,
+                "replies": row.replies,
+                "quotes": row.quotes,
+                "bookmarks": row.bookmarks,
+            }
+            for row in rows
+        ]
 
     def get_pdca_logs(
         self,
@@ -118,7 +132,10 @@ class PdcaService:
     ) -> List[PdcaLog]:
         query = self.db.query(PdcaLog)
         if analysis_type:
-            query = query.filter(PdcaLog.analysis_type == AnalysisType(analysis_type))
+            analysis_type_member = _ANALYSIS_TYPES.get(analysis_type)
+            if analysis_type_member is None:
+                raise ValueError(f"Unknown analysis type: {analysis_type}")
+            query = query.filter(PdcaLog.analysis_type == analysis_type_member)
         return (
             query.order_by(desc(PdcaLog.created_at))
             .offset(skip)
@@ -136,6 +153,5 @@ class PdcaService:
             raise ValueError(f"PDCA log {pdca_log_id} not found.")
         pdca_log.applied_changes = changes
         self.db.commit()
-        self.db.refresh(pdca_log)
         logger.info("Applied changes to PDCA log id=%d", pdca_log_id)
         return pdca_log
@@ -1,14 +1,49 @@
 import logging
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 
 from app.models.models import Persona
+from app.utils.cache import TTLCache
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# Columns read for list responses (the PersonaResponse fields)
+_PERSONA_LIST_COLUMNS = (
+    Persona.id,
+    Persona.name,
+    Persona.description,
+    Persona.personality_traits,
+    Persona.background_story,
+    Persona.target_audience,
+    Persona.expertise_areas,
+    Persona.communication_style,
+    Persona.tone,
+    Persona.language_patterns,
+    Persona.example_posts,
+    Persona.is_active,
+    Persona.created_at,
+    Persona.updated_at,
+)
+
+
+# Active persona per user, as a column dict, read on every AI generation.
+# Writes through this service invalidate it; other workers see changes within
+# the TTL. None (no active persona) is cached too.
+_active_cache = TTLCache(ttl=60, maxsize=1024)
+_NO_PERSONA: Dict[str, Any] = {}
+
+
+def _invalidate_active(user_id: Optional[int]) -> None:
+    if user_id is None:
+        # Unscoped writes can touch any user's personas
+        _active_cache.clear()
+    else:
+        _active_cache.pop(user_id)
+
 
 class PersonaService:
     def __init__(self, db: Session) -> None:
@@ -19,24 +54,19 @@ class PersonaService:
         persona.user_id = user_id
         self.db.add(persona)
         self.db.commit()
-        self.db.refresh(persona)
+        if persona.is_active:
+            _invalidate_active(user_id)
         logger.info("Created persona id=%d name=%s", persona.id, persona.name)
         return persona
 
     def get_personas(
         self, skip: int = 0, limit: int = 20, user_id: Optional[int] = None
-    ) -> Tuple[List[Persona], int]:
-        query = self.db.query(Persona)
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # Read as columns: list responses don't need ORM objects
+        query = self.db.query(*_PERSONA_LIST_COLUMNS)
         if user_id is not None:
             query = query.filter(Persona.user_id == user_id)
-        total = query.count()
-        personas = (
-            query.order_by(desc(Persona.created_at))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return personas, total
+        return paginate(query.order_by(desc(Persona.created_at)), skip, limit)
 
     def get_persona(self, persona_id: int, user_id: Optional[int] = None) -> Persona:
         query = self.db.query(Persona).filter(Persona.id == persona_id)
@@ -54,7 +84,7 @@ class PersonaService:
         for field, value in data.items():
             setattr(persona, field, value)
         self.db.commit()
-        self.db.refresh(persona)
+        _invalidate_active(user_id)
         logger.info("Updated persona id=%d", persona.id)
         return persona
 
@@ -62,25 +92,48 @@ class PersonaService:
         persona = self.get_persona(persona_id, user_id=user_id)
         self.db.delete(persona)
         self.db.commit()
+        _invalidate_active(user_id)
         logger.info("Deleted persona id=%d", persona_id)
         return True
 
     def get_active_persona(self, user_id: Optional[int] = None) -> Optional[Persona]:
-        query = self.db.query(Persona).filter(Persona.is_active == True)
-        if user_id is not None:
-            query = query.filter(Persona.user_id == user_id)
-        return query.first()
+        """Return the active persona as a detached, read-only copy.
+
+        Served from a short-lived cache; load it with get_persona() to modify it.
+        """
+        columns = _active_cache.get(user_id)
+        if columns is None:
+            query = self.db.query(*_PERSONA_LIST_COLUMNS).filter(Persona.is_active)
+            if user_id is not None:
+                query = query.filter(Persona.user_id == user_id)
+            row = query.first()
+            columns = dict(row._mapping) if row else _NO_PERSONA
+            _active_cache.set(user_id, columns)
+        return Persona(**columns) if columns else None
 
     def activate_persona(self, persona_id: int, user_id: Optional[int] = None) -> Persona:
         # Deactivate all personas (scoped by user_id if provided)
-        deactivate_query = self.db.query(Persona)
+        deactivate = update(Persona).where(Persona.is_active, Persona.id != persona_id)
         if user_id is not None:
-            deactivate_query = deactivate_query.filter(Persona.user_id == user_id)
-        deactivate_query.update({"is_active": False})
-        # Activate the specified one
-        persona = self.get_persona(persona_id, user_id=user_id)
-        persona.is_active = True
+            deactivate = deactivate.where(Persona.user_id == user_id)
+        self.db.execute(
+            deactivate.values(is_active=False).execution_options(synchronize_session=False)
+        )
+        # Activate the specified one, reading it back in the same statement
+        activate = update(Persona).where(Persona.id == persona_id)
+        if user_id is not None:
+            activate = activate.where(Persona.user_id == user_id)
+        persona = self.db.execute(
+            activate.values(is_active=True)
+            .returning(Persona)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).scalar_one_or_none()
+        if not persona:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=404, detail=f"Persona {persona_id} not found."
+            )
         self.db.commit()
-        self.db.refresh(persona)
+        _invalidate_active(user_id)
         logger.info("Activated persona id=%d", persona.id)
         return persona
@@ -1,21 +1,75 @@
-import asyncio
 import logging
+import random
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import delete, desc, insert
 
 from app.models.models import Post, PostStatus, PostType, PostFormat, ThreadPost
 from app.schemas.schemas import PostCreate, PostUpdate
-from app.services.x_api import XApiService, create_x_api_service
+from app.services.x_api import (
+    LONG_FORM_MAX_CHARS,
+    TWEET_MAX_CHARS,
+    XApiService,
+    create_x_api_service,
+)
+from app.utils.enums import enum_map, lookup_enum
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2  # seconds
 
+# Per-format (max characters, label) for a post's own content; thread
+# tweets are checked individually against TWEET_MAX_CHARS
+_CONTENT_LIMITS = {
+    PostFormat.tweet: (TWEET_MAX_CHARS, "Tweet"),
+    PostFormat.long_form: (LONG_FORM_MAX_CHARS, "Long-form"),
+}
+
+_POST_STATUSES = enum_map(PostStatus)
+_POST_TYPES = enum_map(PostType)
+_POST_FORMATS = enum_map(PostFormat)
+_ENUM_FIELDS = {
+    "status": _POST_STATUSES,
+    "post_type": _POST_TYPES,
+    "post_format": _POST_FORMATS,
+}
+
+# Columns read for list responses (the PostResponse fields)
+_POST_LIST_COLUMNS = (
+    Post.id,
+    Post.content,
+    Post.status,
+    Post.post_type,
+    Post.post_format,
+    Post.x_tweet_id,
+    Post.posted_at,
+    Post.retry_count,
+    Post.predicted_impressions,
+    Post.image_url,
+    Post.persona_id,
+    Post.schedule_id,
+    Post.created_at,
+    Post.updated_at,
+)
+_THREAD_POST_COLUMNS = (
+    ThreadPost.id,
+    ThreadPost.parent_post_id,
+    ThreadPost.content,
+    ThreadPost.thread_order,
+    ThreadPost.x_tweet_id,
+    ThreadPost.created_at,
+)
+
+
+def _is_retry_pending(post: Post) -> bool:
+    """Whether a failed publish of the post has a retry queued in the scheduler."""
+    return post.status == PostStatus.scheduled and post.retry_count > 0
+
 
 class PostService:
     def __init__(self, db: Session, user_id: Optional[int] = None) -> None:
@@ -28,28 +82,20 @@ class PostService:
     def create_post(self, data: PostCreate, user_id: Optional[int] = None) -> Post:
         post = Post(
             content=data.content,
-            status=PostStatus(data.status) if data.status else PostStatus.draft,
-            post_type=PostType(data.post_type) if data.post_type else PostType.original,
-            post_format=PostFormat(data.post_format) if data.post_format else PostFormat.tweet,
+            status=lookup_enum(_POST_STATUSES, data.status, "status") if data.status else PostStatus.draft,
+            post_type=lookup_enum(_POST_TYPES, data.post_type, "post_type") if data.post_type else PostType.original,
+            post_format=lookup_enum(_POST_FORMATS, data.post_format, "post_format") if data.post_format else PostFormat.tweet,
             persona_id=data.persona_id,
             schedule_id=data.schedule_id,
         )
         post.user_id = user_id
         self.db.add(post)
-        self.db.commit()
-        self.db.refresh(post)
 
         # Create thread posts if format is thread
         if data.thread_contents and data.post_format == "thread":
-            for idx, thread_content in enumerate(data.thread_contents):
-                thread_post = ThreadPost(
-                    parent_post_id=post.id,
-                    content=thread_content,
-                    thread_order=idx + 1,
-                )
-                self.db.add(thread_post)
-            self.db.commit()
-            self.db.refresh(post)
+            self.db.flush()
+            self._insert_thread_posts(post.id, data.thread_contents)
+        self.db.commit()
 
         logger.info("Created post id=%d format=%s", post.id, post.post_format.value)
         return post
@@ -61,20 +107,41 @@ class PostService:
         status: Optional[str] = None,
         post_type: Optional[str] = None,
         user_id: Optional[int] = None,
-    ) -> Tuple[List[Post], int]:
-        query = self.db.query(Post)
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of posts as plain dicts in PostResponse shape.
+
+        List responses only serialize the rows, so they are read as columns
+        without building ORM objects; thread posts for the whole page come
+        from one extra IN query.
+        """
+        query = self.db.query(*_POST_LIST_COLUMNS)
         if user_id is not None:
             query = query.filter(Post.user_id == user_id)
         if status:
-            query = query.filter(Post.status == PostStatus(status))
+            query = query.filter(Post.status == lookup_enum(_POST_STATUSES, status, "status"))
         if post_type:
-            query = query.filter(Post.post_type == PostType(post_type))
-        total = query.count()
-        posts = query.order_by(desc(Post.created_at)).offset(skip).limit(limit).all()
+            query = query.filter(Post.post_type == lookup_enum(_POST_TYPES, post_type, "post_type"))
+        posts, total = paginate(query.order_by(desc(Post.created_at)), skip, limit)
+
+        threads: Dict[int, List[Dict[str, Any]]] = {}
+        for post in posts:
+            post["thread_posts"] = threads.setdefault(post["id"], [])
+        if threads:
+            thread_rows = (
+                self.db.query(*_THREAD_POST_COLUMNS)
+                .filter(ThreadPost.parent_post_id.in_(threads))
+                .order_by(ThreadPost.thread_order)
+            )
+            for row in thread_rows:
+                threads[row.parent_post_id].append(dict(row._mapping))
         return posts, total
 
     def get_post(self, post_id: int, user_id: Optional[int] = None) -> Post:
-        query = self.db.query(Post).filter(Post.id == post_id)
+        query = (
+            self.db.query(Post)
+            .options(selectinload(Post.thread_posts))
+            .filter(Post.id == post_id)
+        )
         if user_id is not None:
             query = query.filter(Post.user_id == user_id)
         post = query.first()
@@ -85,38 +152,43 @@ class PostService:
     def update_post(self, post_id: int, data: PostUpdate, user_id: Optional[int] = None) -> Post:
         post = self.get_post(post_id, user_id=user_id)
         update_data = data.model_dump(exclude_unset=True)
-        if "status" in update_data and update_data["status"] is not None:
-            update_data["status"] = PostStatus(update_data["status"])
-        if "post_type" in update_data and update_data["post_type"] is not None:
-            update_data["post_type"] = PostType(update_data["post_type"])
-        if "post_format" in update_data and update_data["post_format"] is not None:
-            update_data["post_format"] = PostFormat(update_data["post_format"])
+        for field, members in _ENUM_FIELDS.items():
+            if update_data.get(field) is not None:
+                update_data[field] = lookup_enum(members, update_data[field], field)
 
         # Handle thread_contents separately
         thread_contents = update_data.pop("thread_contents", None)
 
         for field, value in update_data.items():
             setattr(post, field, value)
+        if "status" in update_data:
+            # A manual status change cancels any queued publish retry
+            post.retry_count = 0
 
         # Update thread posts if provided
         if thread_contents is not None:
-            # Remove existing thread posts
-            for tp in post.thread_posts:
-                self.db.delete(tp)
-            # Add new ones
-            for idx, content in enumerate(thread_contents):
-                thread_post = ThreadPost(
-                    parent_post_id=post.id,
-                    content=content,
-                    thread_order=idx + 1,
-                )
-                self.db.add(thread_post)
+            # Replace the whole chain with one DELETE and one INSERT, without
+            # loading the existing thread posts first
+            self.db.execute(delete(ThreadPost).where(ThreadPost.parent_post_id == post.id))
+            self._insert_thread_posts(post.id, thread_contents)
+            # The loaded collection predates the rewrite
+            self.db.expire(post, ["thread_posts"])
 
         self.db.commit()
-        self.db.refresh(post)
         logger.info("Updated post id=%d", post.id)
         return post
 
+    def _insert_thread_posts(self, post_id: int, contents: List[str]) -> None:
+        if not contents:
+            return
+        self.db.execute(
+            insert(ThreadPost),
+            [
+                {"parent_post_id": post_id, "content": content, "thread_order": idx + 1}
+                for idx, content in enumerate(contents)
+            ],
+        )
+
     def delete_post(self, post_id: int, user_id: Optional[int] = None) -> bool:
         post = self.get_post(post_id, user_id=user_id)
         if post.status == PostStatus.posted:
@@ -135,79 +207,104 @@ class PostService:
             raise HTTPException(
                 status_code=400, detail="Post has already been published."
             )
-        # Format-specific validation
-        fmt = post.post_format if post.post_format else PostFormat.tweet
-        if fmt == PostFormat.tweet and len(post.content) > 280:
+        if _is_retry_pending(post):
+            # The queued retry job would publish it a second time
             raise HTTPException(
-                status_code=400,
-                detail="Tweet content exceeds 280 characters.",
-            )
-        if fmt == PostFormat.long_form and len(post.content) > 25000:
-            raise HTTPException(
-                status_code=400,
-                detail="Long-form content exceeds 25,000 characters.",
+                status_code=409, detail="A publish retry is already queued for this post."
             )
+        # Format-specific validation
+        fmt = post.post_format if post.post_format else PostFormat.tweet
         if fmt == PostFormat.thread:
             for tp in post.thread_posts:
-                if len(tp.content) > 280:
+                if len(tp.content) > TWEET_MAX_CHARS:
                     raise HTTPException(
                         status_code=400,
-                        detail=f"Thread tweet #{tp.thread_order} exceeds 280 characters.",
+                        detail=f"Thread tweet #{tp.thread_order} exceeds {TWEET_MAX_CHARS} characters.",
                     )
+        else:
+            limit, label = _CONTENT_LIMITS[fmt]
+            if len(post.content) > limit:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{label} content exceeds {limit:,} characters.",
+                )
         return self._attempt_publish(post, media_ids=media_ids)
 
-    def _attempt_publish(self, post: Post, media_ids: Optional[List[str]] = None) -> Post:
+    def retry_publish(
+        self,
+        post_id: int,
+        attempt: int,
+        media_ids: Optional[List[str]] = None,
+        user_id: Optional[int] = None,
+    ) -> Post:
+        """Run one queued retry of a publish that failed on an earlier attempt."""
+        post = self.get_post(post_id, user_id=user_id)
+        if not _is_retry_pending(post):
+            # Published, or edited or marked failed since the retry was queued
+            return post
+        return self._attempt_publish(post, media_ids=media_ids, attempt=attempt)
+
+    def _attempt_publish(self, post: Post, media_ids: Optional[List[str]] = None, attempt: int = 0) -> Post:
         fmt = post.post_format if post.post_format else PostFormat.tweet
         if fmt == PostFormat.thread and post.thread_posts:
             return self._publish_thread(post)
 
-        last_error = None
-        for attempt in range(MAX_RETRIES):
-            try:
-                tweet_id = self.x_api.post_tweet(post.content, media_ids=media_ids)
-                post.x_tweet_id = tweet_id
-                post.status = PostStatus.posted
-                post.posted_at = datetime.utcnow()
-                post.retry_count = attempt
+        try:
+            tweet_id = self.x_api.post_tweet(post.content, media_ids=media_ids)
+        except HTTPException as exc:
+            post.retry_count = attempt + 1
+            # Only X API errors (502) and rate limits (429) are retried; a
+            # rejected post (400) or an open circuit during an outage (503)
+            # fails straight away
+            if exc.status_code in (429, 502) and attempt < MAX_RETRIES - 1:
+                # Hand the backoff to the scheduler rather than sleeping on
+                # the caller's thread; the post stays scheduled, with a
+                # non-zero retry_count marking the retry pending, until it runs.
+                # Jitter spreads out retries of posts that failed together.
+                delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if exc.status_code == 429:
+                    # No point retrying before X lifts the limit
+                    delay = max(delay, float((exc.headers or {}).get("Retry-After", 0)))
+                post.status = PostStatus.scheduled
                 self.db.commit()
-                self.db.refresh(post)
-                logger.info(
-                    "Published post id=%d, tweet_id=%s (attempt %d)",
-                    post.id,
-                    tweet_id,
+                logger.warning(
+                    "Publish attempt %d failed for post %d, retrying in %.1fs: %s",
                     attempt + 1,
+                    post.id,
+                    delay,
+                    exc.detail,
                 )
+                from app.jobs.scheduler import enqueue_publish_retry
+                enqueue_publish_retry(post.id, post.user_id, attempt + 1, media_ids, delay)
                 return post
-            except HTTPException as exc:
-                last_error = exc
-                post.retry_count = attempt + 1
-                self.db.commit()
-                if attempt < MAX_RETRIES - 1:
-                    delay = RETRY_BASE_DELAY * (2 ** attempt)
-                    logger.warning(
-                        "Publish attempt %d failed for post %d, retrying in %ds: %s",
-                        attempt + 1,
-                        post.id,
-                        delay,
-                        exc.detail,
-                    )
-                    import time
-                    time.sleep(delay)
 
-        post.status = PostStatus.failed
+            post.status = PostStatus.failed
+            self.db.commit()
+            logger.error(
+                "Failed to publish post id=%d after %d attempts", post.id, attempt + 1
+            )
+            raise HTTPException(
+                status_code=exc.status_code,
+                detail=f"Failed to publish after {attempt + 1} attempts: {exc.detail}",
+            )
+
+        post.x_tweet_id = tweet_id
+        post.status = PostStatus.posted
+        post.posted_at = datetime.utcnow()
+        post.retry_count = attempt
         self.db.commit()
-        self.db.refresh(post)
-        logger.error(
-            "Failed to publish post id=%d after %d attempts", post.id, MAX_RETRIES
-        )
-        raise HTTPException(
-            status_code=502,
-            detail=f"Failed to publish after {MAX_RETRIES} attempts: {last_error.detail if last_error else 'Unknown error'}",
+        logger.info(
+            "Published post id=%d, tweet_id=%s (attempt %d)",
+            post.id,
+            tweet_id,
+            attempt + 1,
         )
+        return post
 
     def _publish_thread(self, post: Post) -> Post:
         """Publish a thread as a reply chain."""
-        sorted_tweets = sorted(post.thread_posts, key=lambda t: t.thread_order)
+        # The relationship is already ordered by thread_order
+        sorted_tweets = post.thread_posts
         reply_to_id = None
 
         for idx, thread_tweet in enumerate(sorted_tweets):
@@ -219,11 +316,12 @@ class PostService:
                 if idx == 0:
                     post.x_tweet_id = tweet_id
                 reply_to_id = tweet_id
+                # The tweet is live on X now; record its id before the next
+                # call so no later error can lose it
                 self.db.commit()
             except HTTPException as exc:
                 post.status = PostStatus.failed
                 self.db.commit()
-                self.db.refresh(post)
                 logger.error(
                     "Thread publish failed at tweet #%d for post %d: %s",
                     idx + 1, post.id, exc.detail,
@@ -233,6 +331,5 @@ class PostService:
         post.status = PostStatus.posted
         post.posted_at = datetime.utcnow()
         self.db.commit()
-        self.db.refresh(post)
         logger.info("Published thread post id=%d (%d tweets)", post.id, len(sorted_tweets))
         return post
@@ -1,11 +1,11 @@
-import json
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 
+import orjson
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, update
 
 from app.models.models import (
     ImpressionPrediction,
@@ -15,9 +15,19 @@ from app.models.models import (
     PostFormat,
 )
 from app.services.ai_service import AIService, create_ai_service
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Historical averages fed to every prediction, keyed by days. They only move
+# when analytics are collected, which clears the cache.
+_metrics_cache = TTLCache(ttl=300, maxsize=64)
+
+
+def invalidate_recent_metrics() -> None:
+    """Drop cached historical averages after new analytics are written."""
+    _metrics_cache.clear()
+
 
 class PredictionService:
     def __init__(self, db: Session, user_id: Optional[int] = None) -> None:
@@ -56,28 +66,11 @@ class PredictionService:
             "Predict the performance and provide improvement suggestions."
         )
 
+        # Same post and metrics, same prediction: safe to serve from the LLM cache
+        response_text = self.ai_service.call_llm(system_prompt, user_prompt, 1024, cache=True)
         try:
-            response_text = self.ai_service.call_llm(system_prompt, user_prompt, 1024)
-            result = json.loads(response_text)
-
-            prediction = {
-                "predicted_impressions": int(
-                    result.get("predicted_impressions", past_metrics.get("avg_impressions", 1000))
-                ),
-                "predicted_likes": int(result.get("predicted_likes", 0)),
-                "predicted_retweets": int(result.get("predicted_retweets", 0)),
-                "confidence_score": float(
-                    min(max(result.get("confidence_score", 0.5), 0.0), 1.0)
-                ),
-                "factors": result.get("factors", {}),
-                "suggestions": result.get("suggestions", []),
-            }
-
-            # Record prediction
-            self._record_prediction(content, post_format, prediction)
-
-            return prediction
-        except (json.JSONDecodeError, KeyError):
+            prediction = _parse_prediction(response_text, past_metrics)
+        except (AttributeError, TypeError, ValueError):
             logger.error("Failed to parse prediction response")
             fallback = {
                 "predicted_impressions": int(past_metrics.get("avg_impressions", 1000)),
@@ -89,7 +82,15 @@ class PredictionService:
             }
             return fallback
 
+        # Record prediction
+        self._record_prediction(content, post_format, prediction)
+
+        return prediction
+
     def _get_recent_metrics(self, days: int = 30) -> Dict[str, Any]:
+        cached = _metrics_cache.get(days)
+        if cached is not None:
+            return cached
         cutoff = datetime.utcnow() - timedelta(days=days)
         results = (
             self.db.query(
@@ -102,13 +103,15 @@ class PredictionService:
             .filter(PostAnalytics.collected_at >= cutoff)
             .first()
         )
-        return {
+        metrics = {
             "total_posts": results.total or 0,
             "avg_impressions": float(results.avg_imp or 0),
             "avg_likes": float(results.avg_likes or 0),
             "avg_retweets": float(results.avg_rt or 0),
             "max_impressions": results.max_imp or 0,
         }
+        _metrics_cache.set(days, metrics)
+        return metrics
 
     def _record_prediction(
         self, content: str, post_format: str, prediction: Dict[str, Any]
@@ -124,16 +127,49 @@ class PredictionService:
         )
         self.db.add(record)
         self.db.commit()
-        self.db.refresh(record)
         return record
 
     def update_actual(self, post_id: int, actual_impressions: int) -> None:
         """Update prediction records with actual impression data."""
-        predictions = (
-            self.db.query(ImpressionPrediction)
-            .filter(ImpressionPrediction.post_id == post_id)
-            .all()
+        self.update_actual_many({post_id: actual_impressions})
+
+    def update_actual_many(self, actual_by_post: Dict[int, int]) -> None:
+        """Set actual impressions on the predictions of many posts.
+
+        One UPDATE statement executed for all posts (executemany) rather than
+        loading and flushing each prediction row.
+        """
+        if not actual_by_post:
+            return
+        table = ImpressionPrediction.__table__
+        self.db.execute(
+            update(table)
+            .where(table.c.post_id == bindparam("b_post_id"))
+            .values(actual_impressions=bindparam("b_actual")),
+            [
+                {"b_post_id": post_id, "b_actual": actual}
+                for post_id, actual in actual_by_post.items()
+            ],
         )
-        for pred in predictions:
-            pred.actual_impressions = actual_impressions
         self.db.commit()
+
+
+def _parse_prediction(response_text: str, past_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse the model's JSON prediction and coerce each field to its type.
+
+    Raises ValueError (orjson.JSONDecodeError included) on malformed JSON, and
+    AttributeError/TypeError/ValueError when the payload isn't an object or a
+    field can't be coerced.
+    """
+    result = orjson.loads(response_text)
+    confidence = float(result.get("confidence_score", 0.5))
+    return {
+        "predicted_impressions": int(
+            result.get("predicted_impressions", past_metrics.get("avg_impressions", 1000))
+        ),
+        "predicted_likes": int(result.get("predicted_likes", 0)),
+        "predicted_retweets": int(result.get("predicted_retweets", 0)),
+        "confidence_score": min(max(confidence, 0.0), 1.0),
+        "factors": result.get("factors", {}),
+        "suggestions": result.get("suggestions", []),
+    }
@@ -1,15 +1,31 @@
 import logging
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 
 from app.models.models import Schedule, ScheduleType, PostType
 from app.schemas.schemas import ScheduleCreate, ScheduleUpdate
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# Columns read for list responses (the ScheduleResponse fields)
+_SCHEDULE_LIST_COLUMNS = (
+    Schedule.id,
+    Schedule.name,
+    Schedule.schedule_type,
+    Schedule.cron_expression,
+    Schedule.scheduled_at,
+    Schedule.is_active,
+    Schedule.post_type,
+    Schedule.ai_prompt,
+    Schedule.template_id,
+    Schedule.created_at,
+    Schedule.updated_at,
+)
+
 
 class ScheduleService:
     def __init__(self, db: Session) -> None:
@@ -41,7 +57,6 @@ class ScheduleService:
         schedule.user_id = user_id
         self.db.add(schedule)
         self.db.commit()
-        self.db.refresh(schedule)
         logger.info("Created schedule id=%d name='%s'", schedule.id, schedule.name)
         return schedule
 
@@ -51,17 +66,14 @@ class ScheduleService:
         limit: int = 20,
         is_active: Optional[bool] = None,
         user_id: Optional[int] = None,
-    ) -> Tuple[List[Schedule], int]:
-        query = self.db.query(Schedule)
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        # Read as columns: list responses don't need ORM objects
+        query = self.db.query(*_SCHEDULE_LIST_COLUMNS)
         if user_id is not None:
             query = query.filter(Schedule.user_id == user_id)
         if is_active is not None:
             query = query.filter(Schedule.is_active == is_active)
-        total = query.count()
-        schedules = (
-            query.order_by(desc(Schedule.created_at)).offset(skip).limit(limit).all()
-        )
-        return schedules, total
+        return paginate(query.order_by(desc(Schedule.created_at)), skip, limit)
 
     def get_schedule(self, schedule_id: int, user_id: Optional[int] = None) -> Schedule:
         query = self.db.query(Schedule).filter(Schedule.id == schedule_id)
@@ -87,7 +99,6 @@ class ScheduleService:
             setattr(schedule, field, value)
 
         self.db.commit()
-        self.db.refresh(schedule)
         logger.info("Updated schedule id=%d", schedule.id)
         return schedule
 
@@ -99,17 +110,27 @@ class ScheduleService:
         return True
 
     def toggle_schedule(self, schedule_id: int, user_id: Optional[int] = None) -> Schedule:
-        schedule = self.get_schedule(schedule_id, user_id=user_id)
-        schedule.is_active = not schedule.is_active
+        # Flip the flag in the database and read the row back in one statement
+        toggle = update(Schedule).where(Schedule.id == schedule_id)
+        if user_id is not None:
+            toggle = toggle.where(Schedule.user_id == user_id)
+        schedule = self.db.execute(
+            toggle.values(is_active=~Schedule.is_active)
+            .returning(Schedule)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).scalar_one_or_none()
+        if not schedule:
+            raise HTTPException(
+                status_code=404, detail=f"Schedule {schedule_id} not found."
+            )
         self.db.commit()
-        self.db.refresh(schedule)
         logger.info(
             "Toggled schedule id=%d, is_active=%s", schedule.id, schedule.is_active
         )
         return schedule
 
     def get_active_schedules(self, user_id: Optional[int] = None) -> List[Schedule]:
-        query = self.db.query(Schedule).filter(Schedule.is_active == True)
+        query = self.db.query(Schedule).filter(Schedule.is_active)
         if user_id is not None:
             query = query.filter(Schedule.user_id == user_id)
         return query.all()
@@ -1,14 +1,47 @@
 import logging
+from itertools import islice
 from typing import Optional, List, Tuple, Dict, Any
 
 from fastapi import HTTPException
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, or_, update
 
 from app.models.models import ContentStrategy
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# The ContentStrategyResponse fields, selected as columns for the list endpoint
+_STRATEGY_LIST_COLUMNS = (
+    ContentStrategy.id,
+    ContentStrategy.name,
+    ContentStrategy.content_pillars,
+    ContentStrategy.hashtag_groups,
+    ContentStrategy.posting_frequency,
+    ContentStrategy.optimal_posting_times,
+    ContentStrategy.impression_target,
+    ContentStrategy.follower_growth_target,
+    ContentStrategy.engagement_rate_target,
+    ContentStrategy.content_mix,
+    ContentStrategy.avoid_topics,
+    ContentStrategy.competitor_accounts,
+    ContentStrategy.is_active,
+    ContentStrategy.created_at,
+    ContentStrategy.updated_at,
+)
+
+# The fields get_recommendations reads; skips the remaining JSON columns
+_RECOMMENDATION_COLUMNS = (
+    ContentStrategy.name,
+    ContentStrategy.content_pillars,
+    ContentStrategy.content_mix,
+    ContentStrategy.optimal_posting_times,
+    ContentStrategy.hashtag_groups,
+    ContentStrategy.impression_target,
+    ContentStrategy.follower_growth_target,
+)
+
 
 class StrategyService:
     def __init__(self, db: Session) -> None:
@@ -25,18 +58,11 @@ class StrategyService:
 
     def get_strategies(
         self, skip: int = 0, limit: int = 20, user_id: Optional[int] = None
-    ) -> Tuple[List[ContentStrategy], int]:
-        query = self.db.query(ContentStrategy)
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        query = self.db.query(*_STRATEGY_LIST_COLUMNS)
         if user_id is not None:
             query = query.filter(ContentStrategy.user_id == user_id)
-        total = query.count()
-        strategies = (
-            query.order_by(desc(ContentStrategy.created_at))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return strategies, total
+        return paginate(query.order_by(desc(ContentStrategy.created_at)), skip, limit)
 
     def get_strategy(self, strategy_id: int, user_id: Optional[int] = None) -> ContentStrategy:
         query = (
@@ -62,8 +88,17 @@ class StrategyService:
         return strategy
 
     def delete_strategy(self, strategy_id: int, user_id: Optional[int] = None) -> bool:
-        strategy = self.get_strategy(strategy_id, user_id=user_id)
-        self.db.delete(strategy)
+        stmt = (
+            delete(ContentStrategy)
+            .where(ContentStrategy.id == strategy_id)
+            .execution_options(synchronize_session=False)
+        )
+        if user_id is not None:
+            stmt = stmt.where(ContentStrategy.user_id == user_id)
+        if self.db.execute(stmt).rowcount == 0:
+            raise HTTPException(
+                status_code=404, detail=f"Strategy {strategy_id} not found."
+            )
         self.db.commit()
         logger.info("Deleted strategy id=%d", strategy_id)
         return True
@@ -71,52 +106,77 @@ class StrategyService:
     def get_active_strategy(self, user_id: Optional[int] = None) -> Optional[ContentStrategy]:
         query = (
             self.db.query(ContentStrategy)
-            .filter(ContentStrategy.is_active == True)
+            .filter(ContentStrategy.is_active)
+        )
+        if user_id is not None:
+            query = query.filter(ContentStrategy.user_id == user_id)
+        return query.first()
+
+    def _get_active_strategy_projection(self, user_id: Optional[int] = None) -> Optional[Row]:
+        query = (
+            self.db.query(*_RECOMMENDATION_COLUMNS)
+            .filter(ContentStrategy.is_active)
         )
         if user_id is not None:
             query = query.filter(ContentStrategy.user_id == user_id)
         return query.first()
 
     def activate_strategy(self, strategy_id: int, user_id: Optional[int] = None) -> ContentStrategy:
-        # Deactivate all strategies (scoped by user_id if provided)
-        deactivate_query = self.db.query(ContentStrategy)
+        # One UPDATE (scoped by user_id if provided) sets is_active true only
+        # for the requested id; it touches just the rows whose value changes,
+        # i.e. the currently active one(s) and the target
+        stmt = (
+            update(ContentStrategy)
+            .where(or_(ContentStrategy.is_active, ContentStrategy.id == strategy_id))
+            .values(is_active=ContentStrategy.id == strategy_id)
+        )
         if user_id is not None:
-            deactivate_query = deactivate_query.filter(ContentStrategy.user_id == user_id)
-        deactivate_query.update({"is_active": False})
-        # Activate the specified one
-        strategy = self.get_strategy(strategy_id, user_id=user_id)
-        strategy.is_active = True
+            stmt = stmt.where(ContentStrategy.user_id == user_id)
+        # RETURNING refreshes exactly the changed rows, so the session needs
+        # no Python-side synchronize pass over its other objects
+        changed = self.db.execute(
+            stmt.returning(ContentStrategy).execution_options(
+                synchronize_session=False, populate_existing=True
+            )
+        ).scalars().all()
+        strategy = next((s for s in changed if s.id == strategy_id), None)
+        if strategy is None:
+            # Unknown id: the UPDATE deactivated the active one, undo it
+            self.db.rollback()
+            raise HTTPException(
+                status_code=404, detail=f"Strategy {strategy_id} not found."
+            )
         self.db.commit()
-        self.db.refresh(strategy)
         logger.info("Activated strategy id=%d", strategy.id)
         return strategy
 
     def get_recommendations(self, user_id: Optional[int] = None) -> Dict[str, Any]:
         """Return basic recommendations based on active strategy."""
-        strategy = self.get_active_strategy(user_id=user_id)
+        strategy = self._get_active_strategy_projection(user_id=user_id)
         if not strategy:
             return {
                 "message": "No active strategy. Create and activate a strategy first.",
                 "recommendations": [],
             }
         recs = []
-        if strategy.content_pillars:
+        pillars = strategy.content_pillars
+        if pillars:
             recs.append(
-                f"Focus on your {len(strategy.content_pillars)} content pillars: "
-                + ", ".join(strategy.content_pillars[:3])
+                f"Focus on your {len(pillars)} content pillars: "
+                + ", ".join(islice(pillars, 3))
             )
         if strategy.content_mix:
-            mix_parts = [
+            mix_parts = ", ".join(
                 f"{k}: {v:.0f}%" for k, v in strategy.content_mix.items()
-            ]
-            recs.append(f"Maintain content mix: {', '.join(mix_parts)}")
-        if strategy.optimal_posting_times:
-            recs.append(
-                f"Post at optimal times: {', '.join(strategy.optimal_posting_times[:3])}"
             )
+            recs.append(f"Maintain content mix: {mix_parts}")
+        if strategy.optimal_posting_times:
+            times = ", ".join(islice(strategy.optimal_posting_times, 3))
+            recs.append(f"Post at optimal times: {times}")
         if strategy.hashtag_groups:
-            groups = list(strategy.hashtag_groups.keys())
-            recs.append(f"Rotate hashtag groups: {', '.join(groups[:3])}")
+            # Iterating the dict yields its keys without copying them all
+            groups = ", ".join(islice(strategy.hashtag_groups, 3))
+            recs.append(f"Rotate hashtag groups: {groups}")
         recs.append(
             f"Target: {strategy.impression_target:,} impressions, "
             f"{strategy.follower_growth_target:,} follower growth/month"
@@ -1,16 +1,75 @@
 import logging
 import re
-from typing import Optional, List, Tuple, Dict
+from functools import lru_cache
+from typing import Any, Optional, List, Tuple, Dict
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import delete, desc, select, update
 
-from app.models.models import Template
+from app.models.models import Schedule, Template
 from app.schemas.schemas import TemplateCreate, TemplateUpdate
+from app.utils.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# Any {{key}}, looked up verbatim, so keys like "product-name" or " name "
+# resolve as they always have
+_PLACEHOLDER_RE = re.compile(r"\{\{(.+?)\}\}")
+
+# The TemplateResponse fields, selected as columns for the list endpoint
+_TEMPLATE_LIST_COLUMNS = (
+    Template.id,
+    Template.name,
+    Template.content_pattern,
+    Template.variables,
+    Template.category,
+    Template.is_active,
+    Template.created_at,
+    Template.updated_at,
+)
+
+
+@lru_cache(maxsize=2048)
+def _parse_pattern(pattern: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """Split a pattern once into (literal, placeholder name or None) segments."""
+    segments: List[Tuple[str, Optional[str]]] = []
+    pos = 0
+    for match in _PLACEHOLDER_RE.finditer(pattern):
+        if match.start() > pos:
+            segments.append((pattern[pos:match.start()], None))
+        segments.append((match.group(0), match.group(1)))
+        pos = match.end()
+    if pos < len(pattern):
+        segments.append((pattern[pos:], None))
+    return tuple(segments)
+
+
+@lru_cache(maxsize=1024)
+def _render_pattern(
+    pattern: str, variables: Tuple[Tuple[str, str], ...]
+) -> Tuple[str, Tuple[str, ...]]:
+    """Fill a pattern's placeholders; return the text and the names left
+    without a value.
+
+    A pure function of its arguments, so a schedule re-rendering the same
+    template with the same values skips the work. Otherwise the pre-parsed
+    segments are joined without scanning the pattern again.
+    """
+    values = dict(variables)
+    parts: List[str] = []
+    remaining: List[str] = []
+    for text, name in _parse_pattern(pattern):
+        if name is None:
+            parts.append(text)
+        elif name in values:
+            parts.append(values[name])
+        else:
+            # Keep the placeholder as written
+            parts.append(text)
+            remaining.append(name)
+    return "".join(parts), tuple(remaining)
+
 
 class TemplateService:
     def __init__(self, db: Session) -> None:
@@ -38,19 +97,15 @@ class TemplateService:
         category: Optional[str] = None,
         is_active: Optional[bool] = None,
         user_id: Optional[int] = None,
-    ) -> Tuple[List[Template], int]:
-        query = self.db.query(Template)
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        query = self.db.query(*_TEMPLATE_LIST_COLUMNS)
         if user_id is not None:
             query = query.filter(Template.user_id == user_id)
         if category:
             query = query.filter(Template.category == category)
         if is_active is not None:
             query = query.filter(Template.is_active == is_active)
-        total = query.count()
-        templates = (
-            query.order_by(desc(Template.created_at)).offset(skip).limit(limit).all()
-        )
-        return templates, total
+        return paginate(query.order_by(desc(Template.created_at)), skip, limit)
 
     def get_template(self, template_id: int, user_id: Optional[int] = None) -> Template:
         query = self.db.query(Template).filter(Template.id == template_id)
@@ -74,8 +129,26 @@ class TemplateService:
         return template
 
     def delete_template(self, template_id: int, user_id: Optional[int] = None) -> bool:
-        template = self.get_template(template_id, user_id=user_id)
-        self.db.delete(template)
+        owned = select(Template.id).where(Template.id == template_id)
+        if user_id is not None:
+            owned = owned.where(Template.user_id == user_id)
+        # Detach schedules first, as the ORM delete did, so the FK holds
+        self.db.execute(
+            update(Schedule)
+            .where(Schedule.template_id.in_(owned))
+            .values(template_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        result = self.db.execute(
+            delete(Template)
+            .where(Template.id.in_(owned))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=404, detail=f"Template {template_id} not found."
+            )
         self.db.commit()
         logger.info("Deleted template id=%d", template_id)
         return True
@@ -84,15 +157,12 @@ class TemplateService:
         self, template_id: int, variables: Dict[str, str]
     ) -> str:
         template = self.get_template(template_id)
-        content = template.content_pattern
-        for key, value in variables.items():
-            placeholder = "{{" + key + "}}"
-            content = content.replace(placeholder, value)
-        # Check for any remaining unresolved placeholders
-        remaining = re.findall(r"\{\{(\w+)\}\}", content)
+        content, remaining = _render_pattern(
+            template.content_pattern, tuple(sorted(variables.items()))
+        )
         if remaining:
             logger.warning(
-                "Unresolved variables in template %d: %s", template_id, remaining
+                "Unresolved variables in template %d: %s", template_id, list(remaining)
             )
         if len(content) > 280:
             logger.warning(
@@ -1,12 +1,13 @@
 """Per-user settings helper: reads from AppSetting DB with fallback to env vars."""
 
 import logging
-from typing import Optional, Dict
+from typing import Dict, Iterable, Optional
 
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.models import AppSetting
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -27,16 +28,39 @@ _ENV_FALLBACK: Dict[str, str] = {
 }
 
 
-def get_user_setting(db: Session, user_id: int, key: str) -> str:
-    """Read a single setting for user_id from DB, fallback to env var."""
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.user_id == user_id, AppSetting.key == key)
-        .first()
-    )
-    if row and row.value:
-        return row.value
+_AI_SETTING_KEYS = ("ai_provider", "claude_api_key", "openai_api_key")
+X_API_SETTING_KEYS = (
+    "x_api_key",
+    "x_api_secret",
+    "x_access_token",
+    "x_access_token_secret",
+    "x_bearer_token",
+    "api_tier",
+)
+
+
+# Raw AppSetting values per user ({key: value or None}), filled in as keys are
+# read so repeat lookups within a request skip the DB. Writers call
+# invalidate_user_settings; other workers see changes within the TTL.
+_settings_cache = TTLCache(ttl=30, maxsize=1024)
+
+
+def invalidate_user_settings(user_id: int) -> None:
+    """Drop cached settings for user_id; call after writing AppSetting rows."""
+    _settings_cache.pop(user_id)
+
+
+def _cached_values(user_id: int) -> Dict[str, Optional[str]]:
+    values = _settings_cache.get(user_id)
+    if values is None:
+        values = {}
+        _settings_cache.set(user_id, values)
+    return values
+
 
+def _with_fallback(key: str, value: Optional[str]) -> str:
+    if value:
+        return value
     # Fallback to global env var
     attr = _ENV_FALLBACK.get(key)
     if attr:
@@ -44,22 +68,64 @@ def get_user_setting(db: Session, user_id: int, key: str) -> str:
     return ""
 
 
+def get_user_setting(db: Session, user_id: int, key: str) -> str:
+    """Read a single setting for user_id from DB, fallback to env var."""
+    values = _cached_values(user_id)
+    if key not in values:
+        row = (
+            db.query(AppSetting.value)
+            .filter(AppSetting.user_id == user_id, AppSetting.key == key)
+            .first()
+        )
+        values[key] = row.value if row else None
+    return _with_fallback(key, values[key])
+
+
+def get_raw_user_settings(
+    db: Session, user_id: int, keys: Iterable[str]
+) -> Dict[str, Optional[str]]:
+    """Read several stored values for user_id in one query, None where a key
+    has no row; no env fallback. Shares the cache with get_user_settings."""
+    keys = list(keys)
+    values = _cached_values(user_id)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        rows = (
+            db.query(AppSetting.key, AppSetting.value)
+            .filter(AppSetting.user_id == user_id, AppSetting.key.in_(missing))
+            .all()
+        )
+        found = dict(rows)
+        for key in missing:
+            values[key] = found.get(key)
+    return {key: values[key] for key in keys}
+
+
+def get_user_settings(db: Session, user_id: int, keys: Iterable[str]) -> Dict[str, str]:
+    """Read several settings for user_id in one query, each falling back to
+    its env var like get_user_setting."""
+    raw = get_raw_user_settings(db, user_id, keys)
+    return {key: _with_fallback(key, value) for key, value in raw.items()}
+
+
 def get_ai_settings(db: Session, user_id: int) -> dict:
     """Return AI-related settings for a user."""
+    cfg = get_user_settings(db, user_id, _AI_SETTING_KEYS)
     return {
-        "provider": get_user_setting(db, user_id, "ai_provider"),
-        "claude_api_key": get_user_setting(db, user_id, "claude_api_key"),
-        "openai_api_key": get_user_setting(db, user_id, "openai_api_key"),
+        "provider": cfg["ai_provider"],
+        "claude_api_key": cfg["claude_api_key"],
+        "openai_api_key": cfg["openai_api_key"],
     }
 
 
 def get_x_api_settings(db: Session, user_id: int) -> dict:
     """Return X API credentials + tier for a user."""
+    cfg = get_user_settings(db, user_id, X_API_SETTING_KEYS)
     return {
-        "api_key": get_user_setting(db, user_id, "x_api_key"),
-        "api_secret": get_user_setting(db, user_id, "x_api_secret"),
-        "access_token": get_user_setting(db, user_id, "x_access_token"),
-        "access_token_secret": get_user_setting(db, user_id, "x_access_token_secret"),
-        "bearer_token": get_user_setting(db, user_id, "x_bearer_token"),
-        "api_tier": get_user_setting(db, user_id, "api_tier"),
+        "api_key": cfg["x_api_key"],
+        "api_secret": cfg["x_api_secret"],
+        "access_token": cfg["x_access_token"],
+        "access_token_secret": cfg["x_access_token_secret"],
+        "bearer_token": cfg["x_bearer_token"],
+        "api_tier": cfg["api_tier"],
     }
@@ -1,17 +1,32 @@
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Iterator, List, Mapping
 
+import requests
 import tweepy
 from fastapi import HTTPException
+from requests.adapters import HTTPAdapter
 from sqlalchemy.orm import Session
+from urllib3.util.retry import Retry
 
 from app.config import settings
+from app.services.user_settings import (
+    X_API_SETTING_KEYS,
+    get_user_setting,
+    get_user_settings,
+)
+from app.services.x_oauth_service import refresh_oauth2_token
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 TIER_ORDER = {"free": 0, "basic": 1, "pro": 2}
 
-TIER_LIMITS: Dict[str, Dict[str, int]] = {
+_TIER_LIMITS: Dict[str, Dict[str, int]] = {
     "free": {
         "posts_per_month": 1500,
         "reads_per_month": 0,
@@ -29,8 +44,146 @@ TIER_LIMITS: Dict[str, Dict[str, int]] = {
     },
 }
 
+# Read-only views: get_tier_limits hands the inner mappings to callers, so a
+# mutation there must not leak into every other service instance
+TIER_LIMITS: Mapping[str, Mapping[str, int]] = MappingProxyType(
+    {tier: MappingProxyType(limits) for tier, limits in _TIER_LIMITS.items()}
+)
+
+
+# Character limits X enforces on create_tweet: replies and regular tweets,
+# and top-level long-form posts (X Premium)
+TWEET_MAX_CHARS = 280
+LONG_FORM_MAX_CHARS = 25000
+
+# X API v2 accepts up to 100 IDs per GET /2/tweets lookup
+TWEET_LOOKUP_BATCH_SIZE = 100
+# Concurrent lookup requests issued by get_tweets_metrics
+TWEET_LOOKUP_CONCURRENCY = 4
+# GET /2/users/:id/followers returns at most 1000 users per page
+FOLLOWERS_PAGE_SIZE = 1000
+
+# Field lists sent with lookups. Lists, not tuples: tweepy only
+# comma-joins list parameters. Shared, so never mutate them.
+_USER_FIELDS = ["id", "username", "name", "public_metrics"]
+_ME_FIELDS = ["id", "username", "name"]
+_TWEET_FIELDS_PUBLIC = ["public_metrics"]
+# non_public_metrics and organic_metrics require OAuth 1.0a
+_TWEET_FIELDS_ALL = ["public_metrics", "non_public_metrics", "organic_metrics"]
+
+
+def _build_http_session() -> requests.Session:
+    session = requests.Session()
+    # Retry only failed connects: a read retry could post a tweet twice
+    retries = Retry(total=2, read=0, status=0, backoff_factor=0.2)
+    adapter = HTTPAdapter(
+        pool_connections=settings.X_HTTP_POOL_SIZE,
+        pool_maxsize=settings.X_HTTP_POOL_SIZE,
+        max_retries=retries,
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# One connection pool for every tweepy client. tweepy sends auth with each
+# request rather than storing it on the session, so accounts can share it.
+_http_session = _build_http_session()
+
+# tweepy clients (v2 Client and v1.1 API) keyed by credentials, shared by every
+# XApiService built for the same account
+_clients = TTLCache(ttl=3600, maxsize=256)
+
+# Read results keyed by credentials, so dashboard polls within the TTL don't
+# spend the account's X rate limit: tweet metrics, and successful get_me
+_metrics_cache = TTLCache(ttl=60, maxsize=4096)
+_me_cache = TTLCache(ttl=300, maxsize=256)
+
+# X rate limits are 15-minute windows per account and endpoint
+RATE_LIMIT_WINDOW_SECONDS = 900
+
+# (credentials, endpoint) -> epoch seconds when X lifts a 429. Calls to a
+# limited endpoint are shed with 429 until then instead of going out again.
+_rate_limited_until = TTLCache(ttl=RATE_LIMIT_WINDOW_SECONDS, maxsize=1024)
+
+
+def _rate_limit_reset(exc: "tweepy.TooManyRequests") -> float:
+    """When X will accept the call again, from the 429's reset header."""
+    try:
+        return float(exc.response.headers["x-rate-limit-reset"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return time.time() + RATE_LIMIT_WINDOW_SECONDS
+
+
+def _too_many_requests(reset_at: float) -> HTTPException:
+    retry_after = max(1, int(reset_at - time.time()) + 1)
+    return HTTPException(
+        status_code=429,
+        detail=f"X API rate limit reached. Try again in {retry_after}s.",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _is_x_outage(exc: BaseException) -> bool:
+    """Whether a publish error means X itself is degraded.
+
+    Rejections of the request or the account's credentials (4xx) must not
+    trip the circuit for every user.
+    """
+    return isinstance(
+        exc,
+        (tweepy.TwitterServerError, requests.ConnectionError, requests.Timeout),
+    )
+
+
+# Shared by every account: an X outage affects them all
+_publish_breaker = CircuitBreaker(
+    "x_api_publish",
+    fail_max=settings.X_BREAKER_FAIL_MAX,
+    reset_timeout=settings.X_BREAKER_RESET_SECONDS,
+    is_failure=_is_x_outage,
+)
+
+
+def _map_public_metrics(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "impressions": metrics.get("impression_count", 0),
+        "likes": metrics.get("like_count", 0),
+        "retweets": metrics.get("retweet_count", 0),
+        "replies": metrics.get("reply_count", 0),
+        "quotes": metrics.get("quote_count", 0),
+        "bookmarks": metrics.get("bookmark_count", 0),
+    }
+
+
+def _map_user(user: Any) -> Dict[str, Any]:
+    metrics = user.public_metrics or {}
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "name": user.name,
+        "followers_count": metrics.get("followers_count", 0),
+    }
+
 
 class XApiService:
+    # Built per request by create_x_api_service; no per-instance __dict__
+    __slots__ = (
+        "_api_key",
+        "_api_secret",
+        "_access_token",
+        "_access_token_secret",
+        "_bearer_token",
+        "_oauth2_access_token",
+        "current_tier",
+        "_tier_level",
+        "_tier_limits",
+        "_is_oauth2",
+        "_user_auth",
+        "_credentials",
+        "_client",
+        "_api_v1",
+    )
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -48,43 +201,91 @@ class XApiService:
         self._bearer_token = bearer_token or settings.X_BEARER_TOKEN
         self._oauth2_access_token = oauth2_access_token
         self.current_tier = (api_tier or settings.X_API_TIER).lower()
+        self._tier_level = TIER_ORDER.get(self.current_tier, 0)
+        self._tier_limits = TIER_LIMITS.get(self.current_tier, TIER_LIMITS["free"])
         self._is_oauth2 = oauth2_access_token is not None
+        # OAuth 2.0 tokens are sent as bearer auth; OAuth 1.0a signs as the user
+        self._user_auth = not self._is_oauth2
+        if self._oauth2_access_token:
+            self._credentials: tuple = (self._oauth2_access_token,)
+        else:
+            self._credentials = (
+                self._bearer_token,
+                self._api_key,
+                self._api_secret,
+                self._access_token,
+                self._access_token_secret,
+            )
         self._client: Optional[tweepy.Client] = None
         self._api_v1: Optional[tweepy.API] = None
 
     @property
     def client(self) -> tweepy.Client:
         if self._client is None:
-            if self._oauth2_access_token:
-                # OAuth 2.0 User Context: use the bearer token for user-context requests
-                self._client = tweepy.Client(
-                    bearer_token=self._oauth2_access_token,
-                    wait_on_rate_limit=True,
-                )
-            else:
-                self._client = tweepy.Client(
-                    bearer_token=self._bearer_token or None,
-                    consumer_key=self._api_key or None,
-                    consumer_secret=self._api_secret or None,
-                    access_token=self._access_token or None,
-                    access_token_secret=self._access_token_secret or None,
-                    wait_on_rate_limit=True,
-                )
+            key = self._credentials
+            client = _clients.get(key)
+            if client is None:
+                if self._oauth2_access_token:
+                    # OAuth 2.0 User Context: use the bearer token for user-context requests
+                    client = tweepy.Client(bearer_token=self._oauth2_access_token)
+                else:
+                    client = tweepy.Client(
+                        bearer_token=self._bearer_token or None,
+                        consumer_key=self._api_key or None,
+                        consumer_secret=self._api_secret or None,
+                        access_token=self._access_token or None,
+                        access_token_secret=self._access_token_secret or None,
+                    )
+                client.session = _http_session
+                _clients.set(key, client)
+            self._client = client
         return self._client
 
     @property
     def api_v1(self) -> tweepy.API:
         """Tweepy v1.1 API for media upload."""
         if self._api_v1 is None:
-            auth = tweepy.OAuth1UserHandler(
-                consumer_key=self._api_key or "",
-                consumer_secret=self._api_secret or "",
-                access_token=self._access_token or "",
-                access_token_secret=self._access_token_secret or "",
+            key = (
+                "v1",
+                self._api_key,
+                self._api_secret,
+                self._access_token,
+                self._access_token_secret,
             )
-            self._api_v1 = tweepy.API(auth, wait_on_rate_limit=True)
+            api = _clients.get(key)
+            if api is None:
+                auth = tweepy.OAuth1UserHandler(
+                    consumer_key=self._api_key or "",
+                    consumer_secret=self._api_secret or "",
+                    access_token=self._access_token or "",
+                    access_token_secret=self._access_token_secret or "",
+                )
+                api = tweepy.API(auth, wait_on_rate_limit=True)
+                api.session = _http_session
+                _clients.set(key, api)
+            self._api_v1 = api
         return self._api_v1
 
+    @contextmanager
+    def _rate_limit_guard(self, endpoint: str) -> Iterator[None]:
+        """Shed calls to an endpoint X has rate-limited for this account.
+
+        The v2 client does not wait on 429s (that would hold a worker thread
+        for up to 15 minutes); a 429 is raised as HTTPException(429) with
+        Retry-After, and later calls fail fast locally until the reset.
+        """
+        key = (self._credentials, endpoint)
+        reset_at = _rate_limited_until.get(key)
+        if reset_at is not None and reset_at > time.time():
+            raise _too_many_requests(reset_at)
+        try:
+            yield
+        except tweepy.TooManyRequests as exc:
+            reset_at = _rate_limit_reset(exc)
+            _rate_limited_until.set(key, reset_at, ttl=max(1.0, reset_at - time.time()))
+            logger.warning("X API rate limit hit on %s", endpoint)
+            raise _too_many_requests(reset_at) from exc
+
     def upload_media(self, filepath: str) -> Optional[str]:
         """Upload media via v1.1 API and return the media_id string.
 
@@ -103,9 +304,7 @@ class XApiService:
             return None
 
     def require_tier(self, min_tier: str) -> None:
-        current_level = TIER_ORDER.get(self.current_tier, 0)
-        required_level = TIER_ORDER.get(min_tier, 0)
-        if current_level < required_level:
+        if self._tier_level < TIER_ORDER.get(min_tier, 0):
             raise HTTPException(
                 status_code=403,
                 detail=(
@@ -114,92 +313,133 @@ class XApiService:
                 ),
             )
 
-    def get_tier_limits(self) -> Dict[str, int]:
-        return TIER_LIMITS.get(self.current_tier, TIER_LIMITS["free"])
+    def get_tier_limits(self) -> Mapping[str, int]:
+        return self._tier_limits
 
     def post_tweet(
         self, content: str, reply_to: Optional[str] = None,
         media_ids: Optional[List[str]] = None,
     ) -> str:
-        # Long-form posts (X Premium) allow up to 25,000 chars
-        # Regular tweets max 280
-        if not reply_to and len(content) > 25000:
+        # Rejected locally, before the breaker and the network round-trip.
+        # Replies are thread tweets; only a top-level post may be long-form.
+        # A post with media may have no text.
+        if not content.strip() and not media_ids:
+            raise HTTPException(status_code=400, detail="Post content is empty.")
+        limit = TWEET_MAX_CHARS if reply_to else LONG_FORM_MAX_CHARS
+        if len(content) > limit:
             raise HTTPException(
                 status_code=400,
-                detail="Post content exceeds 25,000 characters.",
+                detail=f"Post content exceeds {limit:,} characters.",
             )
         try:
-            kwargs: Dict[str, Any] = {"text": content}
-            if reply_to:
-                kwargs["in_reply_to_tweet_id"] = reply_to
-            if media_ids:
-                kwargs["media_ids"] = media_ids
-            if self._is_oauth2:
-                kwargs["user_auth"] = False
-            response = self.client.create_tweet(**kwargs)
+            with self._rate_limit_guard("create_tweet"), _publish_breaker.call():
+                # tweepy omits arguments left as None from the request
+                response = self.client.create_tweet(
+                    text=content or None,
+                    in_reply_to_tweet_id=reply_to or None,
+                    media_ids=media_ids or None,
+                    user_auth=self._user_auth,
+                )
             tweet_id = str(response.data["id"])
             logger.info("Tweet posted successfully: %s", tweet_id)
             return tweet_id
-        except tweepy.TweepyException as exc:
+        except CircuitOpenError as exc:
+            raise HTTPException(
+                status_code=503,
+                detail="X API is temporarily unavailable. Please try again shortly.",
+            ) from exc
+        except (tweepy.TweepyException, requests.RequestException) as exc:
             logger.error("Failed to post tweet: %s", exc)
             raise HTTPException(
                 status_code=502, detail=f"Failed to post tweet: {exc}"
             ) from exc
 
+    def _metrics_tweet_fields(self) -> List[str]:
+        return _TWEET_FIELDS_PUBLIC if self._is_oauth2 else _TWEET_FIELDS_ALL
+
     def get_tweet_metrics(self, tweet_id: str) -> Dict[str, Any]:
         self.require_tier("basic")
+        cache_key = (self._credentials, tweet_id)
+        cached = _metrics_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
         try:
-            tweet_fields = ["public_metrics"]
-            if not self._is_oauth2:
-                # non_public_metrics and organic_metrics require OAuth 1.0a
-                tweet_fields.extend(["non_public_metrics", "organic_metrics"])
-            response = self.client.get_tweet(
-                tweet_id,
-                tweet_fields=tweet_fields,
-            )
+            with self._rate_limit_guard("get_tweet"):
+                response = self.client.get_tweet(
+                    tweet_id,
+                    tweet_fields=self._metrics_tweet_fields(),
+                )
             if response.data is None:
                 raise HTTPException(
                     status_code=404, detail=f"Tweet {tweet_id} not found."
                 )
-            metrics = response.data.get("public_metrics", {})
-            return {
-                "impressions": metrics.get("impression_count", 0),
-                "likes": metrics.get("like_count", 0),
-                "retweets": metrics.get("retweet_count", 0),
-                "replies": metrics.get("reply_count", 0),
-                "quotes": metrics.get("quote_count", 0),
-                "bookmarks": metrics.get("bookmark_count", 0),
-            }
+            metrics = _map_public_metrics(response.data.get("public_metrics", {}))
+            _metrics_cache.set(cache_key, metrics)
+            return dict(metrics)
         except tweepy.TweepyException as exc:
             logger.error("Failed to get tweet metrics: %s", exc)
             raise HTTPException(
                 status_code=502, detail=f"Failed to get metrics: {exc}"
             ) from exc
 
+    def iter_tweets_metrics(
+        self, tweet_ids: List[str]
+    ) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """Fetch metrics for many tweets, yielding each batch as it completes.
+
+        IDs are sent TWEET_LOOKUP_BATCH_SIZE at a time and batches are fetched
+        concurrently, so callers can persist one batch while the rest are
+        still in flight. Each yielded dict maps tweet_id -> metrics; tweets
+        that were not returned (deleted, protected, or in a failed batch) are
+        absent.
+        """
+        self.require_tier("basic")
+        if not tweet_ids:
+            return
+        tweet_fields = self._metrics_tweet_fields()
+        batches = [
+            tweet_ids[i:i + TWEET_LOOKUP_BATCH_SIZE]
+            for i in range(0, len(tweet_ids), TWEET_LOOKUP_BATCH_SIZE)
+        ]
+
+        def fetch(batch: List[str]) -> List[Any]:
+            try:
+                response = self.client.get_tweets(batch, tweet_fields=tweet_fields)
+                return response.data or []
+            except tweepy.TweepyException as exc:
+                logger.error("Failed to get metrics for %d tweets: %s", len(batch), exc)
+                return []
+
+        workers = min(TWEET_LOOKUP_CONCURRENCY, len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fetch, batch) for batch in batches]
+            for future in as_completed(futures):
+                yield {
+                    str(tweet.id): _map_public_metrics(tweet.get("public_metrics") or {})
+                    for tweet in future.result()
+                }
+
+    def get_tweets_metrics(self, tweet_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch metrics for many tweets using batched lookups.
+
+        Returns tweet_id -> metrics for every tweet that was returned.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        for batch in self.iter_tweets_metrics(tweet_ids):
+            results.update(batch)
+        return results
+
     def search_users(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         self.require_tier("basic")
         try:
-            response = self.client.search_recent_tweets(
-                query=f"from:{query}",
-                max_results=min(max_results, 100),
-                user_fields=["id", "username", "name", "public_metrics"],
-            )
-            users = []
-            if response.includes and "users" in response.includes:
-                for user in response.includes["users"]:
-                    users.append(
-                        {
-                            "id": str(user.id),
-                            "username": user.username,
-                            "name": user.name,
-                            "followers_count": user.public_metrics.get(
-                                "followers_count", 0
-                            )
-                            if user.public_metrics
-                            else 0,
-                        }
-                    )
-            return users
+            with self._rate_limit_guard("search_recent_tweets"):
+                response = self.client.search_recent_tweets(
+                    query=f"from:{query}",
+                    max_results=min(max_results, 100),
+                    user_fields=_USER_FIELDS,
+                )
+            users = (response.includes or {}).get("users") or ()
+            return [_map_user(user) for user in users]
         except tweepy.TweepyException as exc:
             logger.error("Failed to search users: %s", exc)
             raise HTTPException(
@@ -209,10 +449,8 @@ class XApiService:
     def follow_user(self, user_id: str) -> bool:
         self.require_tier("basic")
         try:
-            kwargs: Dict[str, Any] = {"target_user_id": user_id}
-            if self._is_oauth2:
-                kwargs["user_auth"] = False
-            self.client.follow_user(**kwargs)
+            with self._rate_limit_guard("follow_user"):
+                self.client.follow_user(user_id, user_auth=self._user_auth)
             logger.info("Followed user: %s", user_id)
             return True
         except tweepy.TweepyException as exc:
@@ -224,10 +462,8 @@ class XApiService:
     def unfollow_user(self, user_id: str) -> bool:
         self.require_tier("basic")
         try:
-            kwargs: Dict[str, Any] = {"target_user_id": user_id}
-            if self._is_oauth2:
-                kwargs["user_auth"] = False
-            self.client.unfollow_user(**kwargs)
+            with self._rate_limit_guard("unfollow_user"):
+                self.client.unfollow_user(user_id, user_auth=self._user_auth)
             logger.info("Unfollowed user: %s", user_id)
             return True
         except tweepy.TweepyException as exc:
@@ -236,53 +472,56 @@ class XApiService:
                 status_code=502, detail=f"Failed to unfollow user: {exc}"
             ) from exc
 
-    def get_followers(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+    def iter_followers(
+        self, user_id: str, limit: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield a user's followers page by page, up to limit if given.
+
+        Pages are requested only as the caller consumes them, so stopping
+        early skips the remaining requests and memory stays at one page.
+        """
         self.require_tier("basic")
+        page_size = FOLLOWERS_PAGE_SIZE
+        if limit is not None:
+            page_size = max(1, min(limit, FOLLOWERS_PAGE_SIZE))
+        paginator = tweepy.Paginator(
+            self.client.get_users_followers,
+            user_id,
+            max_results=page_size,
+            user_fields=_USER_FIELDS,
+        )
         try:
-            response = self.client.get_users_followers(
-                user_id,
-                max_results=min(max_results, 1000),
-                user_fields=["id", "username", "name", "public_metrics"],
-            )
-            followers = []
-            if response.data:
-                for user in response.data:
-                    followers.append(
-                        {
-                            "id": str(user.id),
-                            "username": user.username,
-                            "name": user.name,
-                            "followers_count": user.public_metrics.get(
-                                "followers_count", 0
-                            )
-                            if user.public_metrics
-                            else 0,
-                        }
-                    )
-            return followers
+            with self._rate_limit_guard("get_users_followers"):
+                for user in paginator.flatten(limit=limit):
+                    yield _map_user(user)
         except tweepy.TweepyException as exc:
             logger.error("Failed to get followers: %s", exc)
             raise HTTPException(
                 status_code=502, detail=f"Failed to get followers: {exc}"
             ) from exc
 
+    def get_followers(self, user_id: str, max_results: int = 100) -> List[Dict[str, Any]]:
+        return list(self.iter_followers(user_id, limit=max_results))
+
     def test_connection(self) -> Dict[str, Any]:
-        try:
-            kwargs: Dict[str, Any] = {"user_fields": ["id", "username", "name"]}
-            if self._is_oauth2:
-                kwargs["user_auth"] = False
-            response = self.client.get_me(**kwargs)
+        me = _me_cache.get(self._credentials)
+        if me is None:
+            try:
+                response = self.client.get_me(
+                    user_fields=_ME_FIELDS, user_auth=self._user_auth
+                )
+            except tweepy.TweepyException as exc:
+                return {"connected": False, "error": str(exc)}
             if response.data is None:
                 return {"connected": False, "error": "Could not retrieve user info."}
-            return {
-                "connected": True,
+            # Only successes are cached, so fixed credentials re-test at once
+            me = {
                 "user_id": str(response.data.id),
                 "username": response.data.username,
                 "name": response.data.name,
-                "tier": self.current_tier,
             }
-        except tweepy.TweepyException as exc:
-            return {"connected": False, "error": str(exc)}
+            _me_cache.set(self._credentials, me)
+        return {"connected": True, **me, "tier": self.current_tier}
 
 
 def create_x_api_service(db: Session, user_id: int) -> XApiService:
@@ -290,21 +529,27 @@ def create_x_api_service(db: Session, user_id: int) -> XApiService:
 
     Prefers OAuth 2.0 tokens when available, falling back to OAuth 1.0a.
     """
-    import time
-    from app.services.user_settings import get_user_setting, get_x_api_settings
-
-    oauth_method = get_user_setting(db, user_id, "x_oauth_method")
+    # Everything either auth path may need, in one query
+    cfg = get_user_settings(
+        db,
+        user_id,
+        (
+            "x_oauth_method",
+            "x_oauth2_access_token",
+            "x_oauth2_token_expires_at",
+            *X_API_SETTING_KEYS,
+        ),
+    )
 
-    if oauth_method == "oauth2":
-        oauth2_token = get_user_setting(db, user_id, "x_oauth2_access_token")
-        expires_at_str = get_user_setting(db, user_id, "x_oauth2_token_expires_at")
+    if cfg["x_oauth_method"] == "oauth2":
+        oauth2_token = cfg["x_oauth2_access_token"]
+        expires_at_str = cfg["x_oauth2_token_expires_at"]
 
         # Refresh if token expires within 5 minutes
         if oauth2_token and expires_at_str:
             try:
                 expires_at = float(expires_at_str)
                 if time.time() > expires_at - 300:
-                    from app.services.x_oauth_service import refresh_oauth2_token
                     if refresh_oauth2_token(db, user_id):
                         oauth2_token = get_user_setting(
                             db, user_id, "x_oauth2_access_token"
@@ -313,10 +558,9 @@ def create_x_api_service(db: Session, user_id: int) -> XApiService:
                 pass
 
         if oauth2_token:
-            api_tier = get_user_setting(db, user_id, "api_tier") or None
             return XApiService(
                 oauth2_access_token=oauth2_token,
-                api_tier=api_tier,
+                api_tier=cfg["api_tier"] or None,
             )
 
         logger.warning(
@@ -326,12 +570,11 @@ def create_x_api_service(db: Session, user_id: int) -> XApiService:
         )
 
     # Fallback: OAuth 1.0a with manual credentials
-    cfg = get_x_api_settings(db, user_id)
     return XApiService(
-        api_key=cfg["api_key"] or None,
-        api_secret=cfg["api_secret"] or None,
-        access_token=cfg["access_token"] or None,
-        access_token_secret=cfg["access_token_secret"] or None,
-        bearer_token=cfg["bearer_token"] or None,
+        api_key=cfg["x_api_key"] or None,
+        api_secret=cfg["x_api_secret"] or None,
+        access_token=cfg["x_access_token"] or None,
+        access_token_secret=cfg["x_access_token_secret"] or None,
+        bearer_token=cfg["x_bearer_token"] or None,
         api_tier=cfg["api_tier"] or None,
     )
@@ -1,29 +1,43 @@
 """X OAuth 2.0 PKCE service for account linking.
 
 Implements the full OAuth 2.0 Authorization Code Flow with PKCE
-using httpx (no tweepy OAuth2UserHandler dependency).
+using httpx (no tweepy dependency).
 """
 
 import hashlib
+import heapq
 import logging
 import secrets
+import threading
 import time
 from base64 import urlsafe_b64encode
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 from urllib.parse import urlencode
 
 import httpx
-import tweepy
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.models import AppSetting
+from app.services.user_settings import (
+    get_user_setting,
+    get_user_settings,
+    invalidate_user_settings,
+)
+from app.utils.dialect import dialect_insert
 
 logger = logging.getLogger(__name__)
 
 # In-memory store for PKCE state -> verifier mapping.
 # Single-process only; use Redis for multi-worker deployments.
 _pkce_store: Dict[str, Dict[str, Any]] = {}
+# Min-heap of (expires_at, state), so cleanup only touches expired entries
+_pkce_expiry: List[Tuple[float, str]] = []
+_pkce_lock = threading.Lock()
+
+PKCE_TTL_SECONDS = 600
 
 SCOPES = [
     "tweet.read",
@@ -36,6 +50,14 @@ SCOPES = [
 
 X_AUTHORIZE_URL = "https://twitter.com/i/oauth2/authorize"
 X_TOKEN_URL = "https://api.x.com/2/oauth2/token"
+X_USERS_ME_URL = "https://api.x.com/2/users/me"
+
+# Shared client, so token exchanges and refreshes reuse pooled connections
+# instead of paying a TCP+TLS handshake each
+_http = httpx.Client(
+    timeout=30,
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+)
 
 # AppSetting keys used for OAuth 2.0 tokens
 OAUTH2_KEYS = [
@@ -59,29 +81,35 @@ def _generate_code_challenge(verifier: str) -> str:
     return urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
 
 
-def _set_user_setting(
-    db: Session, user_id: int, key: str, value: str, category: str = "oauth"
+def _set_user_settings(
+    db: Session, user_id: int, values: Dict[str, str], category: str = "oauth"
 ) -> None:
-    """Upsert an AppSetting row."""
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.user_id == user_id, AppSetting.key == key)
-        .first()
+    """Upsert several AppSetting rows in one INSERT ... ON CONFLICT statement."""
+    insert = dialect_insert(db)
+    stmt = insert(AppSetting).values(
+        [
+            {"user_id": user_id, "key": key, "value": value, "category": category}
+            for key, value in values.items()
+        ]
     )
-    if row:
-        row.value = value
-    else:
-        db.add(AppSetting(user_id=user_id, key=key, value=value, category=category))
-
-
-def _get_user_setting(db: Session, user_id: int, key: str) -> Optional[str]:
-    """Read a single AppSetting value."""
-    row = (
-        db.query(AppSetting)
-        .filter(AppSetting.user_id == user_id, AppSetting.key == key)
-        .first()
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id", "key"],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()},
+        )
     )
-    return row.value if row else None
+
+
+@lru_cache(maxsize=4)
+def _static_auth_params(client_id: str, redirect_uri: str) -> str:
+    """The urlencoded authorize parameters that are the same for every user."""
+    return urlencode({
+        "response_type": "code",
+        "client_id": client_id,
+        "redirect_uri": redirect_uri,
+        "scope": " ".join(SCOPES),
+        "code_challenge_method": "S256",
+    })
 
 
 def create_authorization_url(user_id: int) -> str:
@@ -93,42 +121,40 @@ def create_authorization_url(user_id: int) -> str:
     code_challenge = _generate_code_challenge(code_verifier)
     state = secrets.token_urlsafe(32)
 
-    params = {
-        "response_type": "code",
-        "client_id": settings.X_CLIENT_ID,
-        "redirect_uri": settings.X_OAUTH_REDIRECT_URI,
-        "scope": " ".join(SCOPES),
-        "state": state,
-        "code_challenge": code_challenge,
-        "code_challenge_method": "S256",
-    }
-
-    auth_url = f"{X_AUTHORIZE_URL}?{urlencode(params)}"
-
-    _pkce_store[state] = {
-        "code_verifier": code_verifier,
-        "user_id": user_id,
-        "created_at": time.time(),
-    }
+    static_params = _static_auth_params(settings.X_CLIENT_ID, settings.X_OAUTH_REDIRECT_URI)
+    # state and the challenge are URL-safe base64, so need no escaping
+    auth_url = (
+        f"{X_AUTHORIZE_URL}?{static_params}"
+        f"&state={state}&code_challenge={code_challenge}"
+    )
 
-    # Expire old entries (>10 min)
-    _cleanup_pkce_store()
+    created_at = time.time()
+    with _pkce_lock:
+        _pkce_store[state] = {
+            "code_verifier": code_verifier,
+            "user_id": user_id,
+            "created_at": created_at,
+        }
+        heapq.heappush(_pkce_expiry, (created_at + PKCE_TTL_SECONDS, state))
 
     return auth_url
 
 
-def _cleanup_pkce_store() -> None:
-    """Remove PKCE entries older than 10 minutes."""
+def cleanup_pkce_store() -> None:
+    """Remove PKCE entries older than 10 minutes; run periodically by the scheduler."""
     now = time.time()
-    expired = [k for k, v in _pkce_store.items() if now - v["created_at"] > 600]
-    for k in expired:
-        del _pkce_store[k]
+    with _pkce_lock:
+        while _pkce_expiry and _pkce_expiry[0][0] < now:
+            _, state = heapq.heappop(_pkce_expiry)
+            _pkce_store.pop(state, None)
 
 
 def exchange_code_for_tokens(state: str, code: str, db: Session) -> Dict[str, Any]:
     """Exchange the authorization code for tokens and persist them."""
-    entry = _pkce_store.pop(state, None)
-    if entry is None:
+    with _pkce_lock:
+        entry = _pkce_store.pop(state, None)
+    # Cleanup runs on a timer, so an expired entry may still be present
+    if entry is None or time.time() - entry["created_at"] > PKCE_TTL_SECONDS:
         raise ValueError("Invalid or expired state parameter")
 
     user_id = entry["user_id"]
@@ -147,7 +173,7 @@ def exchange_code_for_tokens(state: str, code: str, db: Session) -> Dict[str, An
     if settings.X_CLIENT_SECRET:
         auth = (settings.X_CLIENT_ID, settings.X_CLIENT_SECRET)
 
-    resp = httpx.post(X_TOKEN_URL, data=data, auth=auth, timeout=30)
+    resp = _http.post(X_TOKEN_URL, data=data, auth=auth)
     if resp.status_code != 200:
         logger.error("Token exchange failed: %s %s", resp.status_code, resp.text)
         raise ValueError(f"Token exchange failed: {resp.text}")
@@ -158,23 +184,33 @@ def exchange_code_for_tokens(state: str, code: str, db: Session) -> Dict[str, An
     expires_in = token_data.get("expires_in", 7200)
     expires_at = str(int(time.time() + expires_in))
 
-    # Use the access token to get user info via tweepy
-    client = tweepy.Client(bearer_token=access_token)
-    me = client.get_me(user_auth=False)
-    if me.data is None:
+    # Use the access token to get user info, on the same pooled client
+    resp = _http.get(
+        X_USERS_ME_URL, headers={"Authorization": f"Bearer {access_token}"}
+    )
+    me = resp.json().get("data") if resp.status_code == 200 else None
+    if not me:
+        logger.error("Fetching X user info failed: %s %s", resp.status_code, resp.text)
         raise ValueError("Could not retrieve X user info with the new token")
 
-    x_username = me.data.username
-    x_user_id = str(me.data.id)
+    x_username = me["username"]
+    x_user_id = str(me["id"])
 
     # Persist tokens
-    _set_user_setting(db, user_id, "x_oauth2_access_token", access_token)
-    _set_user_setting(db, user_id, "x_oauth2_refresh_token", refresh_token)
-    _set_user_setting(db, user_id, "x_oauth2_token_expires_at", expires_at)
-    _set_user_setting(db, user_id, "x_oauth_method", "oauth2")
-    _set_user_setting(db, user_id, "x_connected_username", x_username)
-    _set_user_setting(db, user_id, "x_connected_user_id", x_user_id)
+    _set_user_settings(
+        db,
+        user_id,
+        {
+            "x_oauth2_access_token": access_token,
+            "x_oauth2_refresh_token": refresh_token,
+            "x_oauth2_token_expires_at": expires_at,
+            "x_oauth_method": "oauth2",
+            "x_connected_username": x_username,
+            "x_connected_user_id": x_user_id,
+        },
+    )
     db.commit()
+    invalidate_user_settings(user_id)
 
     logger.info("OAuth 2.0 tokens saved for user_id=%d (@%s)", user_id, x_username)
 
@@ -187,7 +223,7 @@ def exchange_code_for_tokens(state: str, code: str, db: Session) -> Dict[str, An
 
 def refresh_oauth2_token(db: Session, user_id: int) -> bool:
     """Refresh the OAuth 2.0 access token using the stored refresh token."""
-    refresh_token = _get_user_setting(db, user_id, "x_oauth2_refresh_token")
+    refresh_token = get_user_setting(db, user_id, "x_oauth2_refresh_token")
     if not refresh_token:
         logger.warning("No refresh token for user_id=%d", user_id)
         return False
@@ -206,7 +242,7 @@ def refresh_oauth2_token(db: Session, user_id: int) -> bool:
         if settings.X_CLIENT_SECRET:
             auth = (settings.X_CLIENT_ID, settings.X_CLIENT_SECRET)
 
-        resp = httpx.post(X_TOKEN_URL, data=data, auth=auth, timeout=30)
+        resp = _http.post(X_TOKEN_URL, data=data, auth=auth)
         resp.raise_for_status()
         token_data = resp.json()
 
@@ -215,10 +251,17 @@ def refresh_oauth2_token(db: Session, user_id: int) -> bool:
         expires_in = token_data.get("expires_in", 7200)
         expires_at = str(int(time.time() + expires_in))
 
-        _set_user_setting(db, user_id, "x_oauth2_access_token", new_access)
-        _set_user_setting(db, user_id, "x_oauth2_refresh_token", new_refresh)
-        _set_user_setting(db, user_id, "x_oauth2_token_expires_at", expires_at)
+        _set_user_settings(
+            db,
+            user_id,
+            {
+                "x_oauth2_access_token": new_access,
+                "x_oauth2_refresh_token": new_refresh,
+                "x_oauth2_token_expires_at": expires_at,
+            },
+        )
         db.commit()
+        invalidate_user_settings(user_id)
 
         logger.info("OAuth 2.0 token refreshed for user_id=%d", user_id)
         return True
@@ -232,17 +275,31 @@ def disconnect_x_account(db: Session, user_id: int) -> None:
     db.query(AppSetting).filter(
         AppSetting.user_id == user_id,
         AppSetting.key.in_(OAUTH2_KEYS),
-    ).delete(synchronize_session="fetch")
+    ).delete(synchronize_session=False)
     db.commit()
+    invalidate_user_settings(user_id)
     logger.info("X account disconnected for user_id=%d", user_id)
 
 
 def get_x_connection_status(db: Session, user_id: int) -> Dict[str, Any]:
     """Return the current X connection status for a user."""
-    method = _get_user_setting(db, user_id, "x_oauth_method")
-    username = _get_user_setting(db, user_id, "x_connected_username") or ""
-    x_user_id = _get_user_setting(db, user_id, "x_connected_user_id") or ""
-    expires_at_str = _get_user_setting(db, user_id, "x_oauth2_token_expires_at")
+    # Both auth methods' keys in one query
+    cfg = get_user_settings(
+        db,
+        user_id,
+        (
+            "x_oauth_method",
+            "x_connected_username",
+            "x_connected_user_id",
+            "x_oauth2_token_expires_at",
+            "x_api_key",
+            "x_access_token",
+        ),
+    )
+    method = cfg["x_oauth_method"] or None
+    username = cfg["x_connected_username"]
+    x_user_id = cfg["x_connected_user_id"]
+    expires_at_str = cfg["x_oauth2_token_expires_at"]
 
     token_expired = False
     if method == "oauth2" and expires_at_str:
@@ -251,16 +308,13 @@ def get_x_connection_status(db: Session, user_id: int) -> Dict[str, Any]:
         except ValueError:
             token_expired = True
 
-    connected = method is not None and method != ""
+    connected = method is not None
 
     # Also check OAuth 1.0a: if no oauth_method is set, check for manual keys
-    if not connected:
-        from app.services.user_settings import get_user_setting as get_setting
-        api_key = get_setting(db, user_id, "x_api_key")
-        access_token = get_setting(db, user_id, "x_access_token")
-        if api_key and access_token:
-            connected = True
-            method = "oauth1"
+    # (these fall back to the env credentials)
+    if not connected and cfg["x_api_key"] and cfg["x_access_token"]:
+        connected = True
+        method = "oauth1"
 
     return {
         "connected": connected,
@@ -1,3 +1,8 @@
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.dialect import dialect_insert
+from app.utils.enums import enum_map, lookup_enum
+from app.utils.pagination import paginate
 from app.utils.rate_limiter import RateLimiter
 from app.utils.time_utils import (
     utc_now,
@@ -7,6 +12,13 @@ from app.utils.time_utils import (
 )
 
 __all__ = [
+    "TTLCache",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "dialect_insert",
+    "enum_map",
+    "lookup_enum",
+    "paginate",
     "RateLimiter",
     "utc_now",
     "to_jst",
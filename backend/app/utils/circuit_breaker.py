@@ -0,0 +1,110 @@
+import logging
+import time
+from threading import Lock
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker; wrap each call in `with breaker.call():`.
+
+    After fail_max consecutive failures the circuit opens and every call fails
+    fast with CircuitOpenError for reset_timeout seconds. Then a single trial
+    call is let through: success closes the circuit, failure re-opens it.
+    Only the trial decides that; outcomes of calls that started before the
+    circuit last opened are ignored.
+    Exceptions for which is_failure returns False propagate without counting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fail_max: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._is_failure = is_failure or (lambda exc: isinstance(exc, Exception))
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        # Bumped each time the circuit opens, to tell stale calls apart
+        self._generation = 0
+        self._lock = Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def call(self) -> "_Call":
+        """A context manager guarding one call through the breaker."""
+        return _Call(self)
+
+    def _enter(self) -> Tuple[int, bool]:
+        with self._lock:
+            is_trial = False
+            if self._opened_at is not None:
+                elapsed = time.monotonic() - self._opened_at
+                if elapsed < self.reset_timeout or self._trial_in_flight:
+                    raise CircuitOpenError(
+                        f"{self.name} is unavailable; retry in "
+                        f"{max(self.reset_timeout - elapsed, 1):.0f}s"
+                    )
+                self._trial_in_flight = True
+                is_trial = True
+            return self._generation, is_trial
+
+    def _exit(self, generation: int, is_trial: bool, exc: Optional[BaseException]) -> None:
+        failed = exc is not None and self._is_failure(exc)
+        with self._lock:
+            if is_trial:
+                self._trial_in_flight = False
+                if exc is None:
+                    logger.info("Circuit %s closed", self.name)
+                    self._failures = 0
+                    self._opened_at = None
+                elif failed:
+                    self._opened_at = time.monotonic()
+            elif generation != self._generation:
+                # Started before the circuit (re)opened; says nothing about now
+                pass
+            elif exc is None:
+                self._failures = 0
+            elif failed:
+                self._failures += 1
+                if self._failures >= self.fail_max:
+                    logger.warning(
+                        "Circuit %s opened after %d consecutive failures",
+                        self.name, self._failures,
+                    )
+                    self._opened_at = time.monotonic()
+                    self._generation += 1
+
+
+class _Call:
+    """One call through a CircuitBreaker, remembering whether it is the trial.
+
+    The token lives on this object rather than in thread-local state, so a
+    call may finish on another thread (e.g. a streamed response).
+    """
+
+    __slots__ = ("_breaker", "_generation", "is_trial")
+
+    def __init__(self, breaker: CircuitBreaker) -> None:
+        self._breaker = breaker
+
+    def __enter__(self) -> "_Call":
+        self._generation, self.is_trial = self._breaker._enter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._breaker._exit(self._generation, self.is_trial, exc)
+        return False
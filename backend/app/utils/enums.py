@@ -0,0 +1,22 @@
+from enum import Enum
+from typing import Dict, Type, TypeVar
+
+from fastapi import HTTPException
+
+E = TypeVar("E", bound=Enum)
+
+
+def enum_map(enum_cls: Type[E]) -> Dict[str, E]:
+    """Build a value -> member map once, for lookups on request paths."""
+    return {member.value: member for member in enum_cls}
+
+
+def lookup_enum(members: Dict[str, E], value: str, field: str) -> E:
+    """Map a request string to its enum member, rejecting unknown values with 400."""
+    try:
+        return members[value]
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid {field}: {value}. Expected one of: {', '.join(members)}",
+        )
@@ -0,0 +1,30 @@
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+_TOTAL = "_total"
+
+
+def paginate(query: Query, skip: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Return one page of an ordered column query, as dicts keyed by column
+    name, and the total row count.
+
+    The total comes from a COUNT(*) OVER () window on the same SELECT, so a
+    page costs one round-trip instead of a count() plus the fetch. A page past
+    the end has no rows to carry the window, so only then is count() run.
+    """
+    rows = (
+        query.add_columns(func.count().over().label(_TOTAL))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return [], query.order_by(None).count() if skip else 0
+    items = []
+    for row in rows:
+        item = dict(row._mapping)
+        del item[_TOTAL]
+        items.append(item)
+    return items, rows[0][-1]
@@ -1,9 +1,11 @@
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
 from threading import Lock
-from typing import Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from sqlalchemy import Date, func
 from sqlalchemy.orm import Session
 
 from app.models.models import ApiUsageLog
@@ -41,42 +43,114 @@ ENDPOINT_LIMIT_MAP: Dict[str, str] = {
 }
 
 
+# Each sliding window is kept as this many fixed buckets, so a check sums a
+# handful of counters instead of scanning one timestamp per recorded call
+_WINDOW_BUCKETS = 30
+
+_DAY_SECONDS = 86400
+
+# ApiUsageLog rows are buffered and written in batches: a log_usage call
+# that fills the batch flushes it, the scheduler flushes the rest every
+# second, and past the cap the oldest unwritten rows are dropped
+_LOG_FLUSH_SIZE = 500
+_MAX_PENDING_LOGS = 10000
+
+
+def _window_seconds(limit_key: str) -> int:
+    if "per_month" in limit_key:
+        return 30 * _DAY_SECONDS
+    if "per_day" in limit_key:
+        return _DAY_SECONDS
+    return 3600
+
+
+# Resolved once at import so checks are a single dict lookup
+_MAX_CALLS: Dict[Tuple[str, str], int] = {
+    (tier, category): limits.get(limit_key, 0)
+    for tier, limits in TIER_LIMITS.items()
+    for category, limit_key in ENDPOINT_LIMIT_MAP.items()
+}
+
+_WINDOW_SECONDS: Dict[str, int] = {
+    category: _window_seconds(limit_key)
+    for category, limit_key in ENDPOINT_LIMIT_MAP.items()
+}
+
+
+def _max_calls(endpoint_category: str, tier: str) -> Optional[int]:
+    """The tier's cap for the category (unknown tiers get free's), None if uncapped."""
+    max_calls = _MAX_CALLS.get((tier, endpoint_category))
+    if max_calls is None:
+        max_calls = _MAX_CALLS.get(("free", endpoint_category))
+    return max_calls
+
+
+class _Window:
+    """Call counts over a sliding window, bucketed by time.monotonic().
+
+    Each window carries its own lock, so categories never contend.
+    """
+
+    __slots__ = ("bucket_seconds", "buckets", "total", "lock")
+
+    def __init__(self, window_seconds: int) -> None:
+        self.lock = Lock()
+        self.bucket_seconds = window_seconds / _WINDOW_BUCKETS
+        # [bucket index, count] pairs, oldest first
+        self.buckets: Deque[List[int]] = deque()
+        self.total = 0
+
+    def _prune(self, now: float) -> int:
+        current = int(now // self.bucket_seconds)
+        oldest = current - _WINDOW_BUCKETS
+        while self.buckets and self.buckets[0][0] <= oldest:
+            self.total -= self.buckets.popleft()[1]
+        return current
+
+    def add(self, now: float) -> None:
+        current = self._prune(now)
+        if self.buckets and self.buckets[-1][0] == current:
+            self.buckets[-1][1] += 1
+        else:
+            self.buckets.append([current, 1])
+        self.total += 1
+
+    def count(self, now: float, seconds: Optional[float] = None) -> int:
+        current = self._prune(now)
+        if seconds is None:
+            return self.total
+        oldest = current - int(seconds // self.bucket_seconds)
+        return sum(n for index, n in self.buckets if index > oldest)
+
+
 class RateLimiter:
     def __init__(self) -> None:
-        self._call_log: Dict[str, List[datetime]] = defaultdict(list)
-        self._lock = Lock()
+        self._windows: Dict[str, _Window] = {}
+        self._pending_logs: Deque[Dict[str, Any]] = deque(maxlen=_MAX_PENDING_LOGS)
+
+    def _window(self, endpoint_category: str) -> _Window:
+        window = self._windows.get(endpoint_category)
+        if window is None:
+            seconds = _WINDOW_SECONDS.get(endpoint_category, 30 * _DAY_SECONDS)
+            # setdefault is atomic, so racing first calls share one window
+            window = self._windows.setdefault(endpoint_category, _Window(seconds))
+        return window
 
     def check_limit(self, endpoint_category: str, tier: str, is_admin: bool = False) -> bool:
         # Admin users bypass all rate limits
         if is_admin:
             return True
 
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        limit_key = ENDPOINT_LIMIT_MAP.get(endpoint_category)
-        if not limit_key:
+        max_calls = _max_calls(endpoint_category, tier)
+        if max_calls is None:
             return True
-
-        max_calls = limits.get(limit_key, 0)
         if max_calls == 0:
             return False
 
-        # Determine the window based on the limit key
-        if "per_month" in limit_key:
-            window = timedelta(days=30)
-        elif "per_day" in limit_key:
-            window = timedelta(days=1)
-        else:
-            window = timedelta(hours=1)
-
-        now = datetime.utcnow()
-        cutoff = now - window
-
-        with self._lock:
-            # Clean old entries
-            self._call_log[endpoint_category] = [
-                t for t in self._call_log[endpoint_category] if t > cutoff
-            ]
-            current_count = len(self._call_log[endpoint_category])
+        window = self._window(endpoint_category)
+        now = time.monotonic()
+        with window.lock:
+            current_count = window.count(now)
 
         return current_count < max_calls
 
@@ -89,31 +163,47 @@ class RateLimiter:
         status_code: int = 200,
         db: Optional[Session] = None,
     ) -> None:
-        now = datetime.utcnow()
-
-        with self._lock:
-            self._call_log[endpoint_category].append(now)
+        window = self._window(endpoint_category)
+        now = time.monotonic()
+        with window.lock:
+            window.add(now)
 
-        # Persist to database if session is provided
+        # Queue for the database if a session is provided; deque.append is
+        # atomic, so the queue needs no lock
         if db is not None:
-            log_entry = ApiUsageLog(
-                endpoint=endpoint or endpoint_category,
-                method=method,
-                tier_required=tier,
-                status_code=status_code,
-            )
-            db.add(log_entry)
+            self._pending_logs.append({
+                "endpoint": endpoint or endpoint_category,
+                "method": method,
+                "tier_required": tier,
+                "status_code": status_code,
+                "created_at": datetime.utcnow(),
+            })
+            if len(self._pending_logs) >= _LOG_FLUSH_SIZE:
+                self.flush_usage_logs(db)
+
+    def flush_usage_logs(self, db: Session) -> int:
+        """Write all queued ApiUsageLog rows in one batch; returns the row count."""
+        # popleft one row at a time: it is atomic, unlike copying the deque
+        # while other threads append to it. Rows queued meanwhile wait for
+        # the next flush, and a concurrent flush may drain it first.
+        rows = []
+        pending = self._pending_logs
+        for _ in range(len(pending)):
+            try:
+                rows.append(pending.popleft())
+            except IndexError:
+                break
+        if rows:
+            db.bulk_insert_mappings(ApiUsageLog, rows)
             db.commit()
+        return len(rows)
 
     def get_usage_count(self, endpoint_category: str, window_days: int = 30) -> int:
-        now = datetime.utcnow()
-        cutoff = now - timedelta(days=window_days)
-
-        with self._lock:
-            self._call_log[endpoint_category] = [
-                t for t in self._call_log[endpoint_category] if t > cutoff
-            ]
-            return len(self._call_log[endpoint_category])
+        # Calls older than the category's own limit window are not retained
+        window = self._window(endpoint_category)
+        now = time.monotonic()
+        with window.lock:
+            return window.count(now, window_days * _DAY_SECONDS)
 
     def get_usage_from_db(
         self,
@@ -122,8 +212,6 @@ class RateLimiter:
         window_days: int = 30,
     ) -> Dict[str, int]:
         cutoff = datetime.utcnow() - timedelta(days=window_days)
-        from sqlalchemy import func
-
         result = (
             db.query(
                 ApiUsageLog.endpoint,
@@ -136,10 +224,32 @@ class RateLimiter:
         usage = {row.endpoint: row.count for row in result}
         return usage
 
+    def get_usage_by_day(
+        self,
+        db: Session,
+        tier: str,
+        days: int = 30,
+    ) -> Dict[str, Dict[date, int]]:
+        """Per-endpoint call counts for each day of the window, in one query."""
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        day = func.date(ApiUsageLog.created_at, type_=Date)
+        result = (
+            db.query(
+                ApiUsageLog.endpoint,
+                day.label("day"),
+                func.count(ApiUsageLog.id).label("count"),
+            )
+            .filter(ApiUsageLog.created_at >= cutoff)
+            .group_by(ApiUsageLog.endpoint, day)
+            .all()
+        )
+        usage: Dict[str, Dict[date, int]] = {}
+        for row in result:
+            usage.setdefault(row.endpoint, {})[row.day] = row.count
+        return usage
+
     def get_limit_for_tier(self, endpoint_category: str, tier: str) -> int:
-        limits = TIER_LIMITS.get(tier, TIER_LIMITS["free"])
-        limit_key = ENDPOINT_LIMIT_MAP.get(endpoint_category, "")
-        return limits.get(limit_key, 0)
+        return _max_calls(endpoint_category, tier) or 0
 
 
 # Global singleton rate limiter instance
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 
 # Japan Standard Time (UTC+9)
 JST = timezone(timedelta(hours=9))
@@ -26,13 +28,15 @@ def format_datetime(dt: datetime, fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
     return dt.strftime(fmt)
 
 
-def parse_cron_expression(cron_expr: str) -> Dict[str, str]:
+@lru_cache(maxsize=256)
+def parse_cron_expression(cron_expr: str) -> Mapping[str, str]:
     """Parse a cron expression into its component parts.
 
     Expected format: minute hour day_of_month month day_of_week
     Example: "0 9 * * *" means every day at 09:00
 
-    Returns a dict with keys: minute, hour, day, month, day_of_week
+    Returns a read-only mapping (results are cached and shared) with keys:
+    minute, hour, day, month, day_of_week
     """
     parts = cron_expr.strip().split()
     if len(parts) != 5:
@@ -40,25 +44,18 @@ def parse_cron_expression(cron_expr: str) -> Dict[str, str]:
             f"Invalid cron expression '{cron_expr}': expected 5 fields, got {len(parts)}"
         )
 
-    return {
+    return MappingProxyType({
         "minute": parts[0],
         "hour": parts[1],
         "day": parts[2],
         "month": parts[3],
         "day_of_week": parts[4],
-    }
+    })
 
 
-def get_optimal_posting_times() -> list:
-    """Return a list of optimal posting times for X (Twitter) in JST.
-
-    Based on common engagement patterns:
-    - Morning commute: 7:00-8:00
-    - Lunch: 12:00-13:00
-    - Evening commute: 17:00-19:00
-    - Night: 21:00-23:00
-    """
-    return [
+_OPTIMAL_POSTING_TIMES: Tuple[Mapping[str, str], ...] = tuple(
+    MappingProxyType(entry)
+    for entry in (
         {"time": "07:30", "label": "Morning commute", "engagement_level": "high"},
         {"time": "08:00", "label": "Morning", "engagement_level": "medium"},
         {"time": "12:00", "label": "Lunch break", "engagement_level": "high"},
@@ -68,16 +65,34 @@ def get_optimal_posting_times() -> list:
         {"time": "19:00", "label": "After work", "engagement_level": "medium"},
         {"time": "21:00", "label": "Night", "engagement_level": "high"},
         {"time": "22:00", "label": "Late night", "engagement_level": "medium"},
-    ]
+    )
+)
+
+
+def get_optimal_posting_times() -> Tuple[Mapping[str, str], ...]:
+    """Return the optimal posting times for X (Twitter) in JST.
+
+    Based on common engagement patterns:
+    - Morning commute: 7:00-8:00
+    - Lunch: 12:00-13:00
+    - Evening commute: 17:00-19:00
+    - Night: 21:00-23:00
+
+    The result is a shared, read-only constant.
+    """
+    return _OPTIMAL_POSTING_TIMES
+
+
+# Recommended hours: 7-9, 12-13, 17-19, 21-23; bit h is set for each hour h
+_POSTING_HOURS_MASK = sum(
+    1 << hour
+    for start, end in ((7, 9), (12, 13), (17, 19), (21, 23))
+    for hour in range(start, end + 1)
+)
 
 
 def is_within_posting_hours(dt: Optional[datetime] = None) -> bool:
     """Check if the given time (in JST) is within recommended posting hours."""
     if dt is None:
         dt = utc_now()
-    jst_time = to_jst(dt)
-    hour = jst_time.hour
-
-    # Recommended hours: 7-9, 12-13, 17-19, 21-23
-    posting_ranges = [(7, 9), (12, 13), (17, 19), (21, 23)]
-    return any(start <= hour <= end for start, end in posting_ranges)
+    return bool(_POSTING_HOURS_MASK >> to_jst(dt).hour & 1)
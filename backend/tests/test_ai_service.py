@@ -0,0 +1,30 @@
+from app.services.ai_service import AIService, _output_token_budget
+
+
+def _long_form_max_tokens(language: str, max_length: int, count: int = 1) -> int:
+    service = AIService(provider="claude", claude_api_key="test")
+    seen = {}
+
+    def fake_call_llm_json(system_prompt, user_prompt, max_tokens, tool_name):
+        seen["max_tokens"] = max_tokens
+        return {"posts": ["x"] * count}
+
+    service.call_llm_json = fake_call_llm_json
+    service.generate_long_form("tech", count=count, language=language, max_length=max_length)
+    return seen["max_tokens"]
+
+
+def test_long_form_budget_covers_dense_english_and_envelope():
+    max_length = 5000
+    # Worst case for English: ~3 chars per token (numbers, URLs, escapes),
+    # plus the tool_use envelope around the posts array
+    needed = max_length // 3 + 100
+    assert _long_form_max_tokens("en", max_length) >= needed
+
+
+def test_long_form_budget_keeps_previous_ceiling():
+    assert _long_form_max_tokens("ja", 5000, count=3) == 4096
+
+
+def test_budget_has_a_floor_for_short_output():
+    assert _output_token_budget(10, 1, "en", 1024) >= 256
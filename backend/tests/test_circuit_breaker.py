@@ -0,0 +1,50 @@
+import pytest
+
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _open(breaker: CircuitBreaker) -> None:
+    with pytest.raises(RuntimeError):
+        with breaker.call():
+            raise RuntimeError("down")
+
+
+def test_stale_call_exit_does_not_admit_a_second_trial():
+    breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0)
+
+    stale = breaker.call().__enter__()  # started before the outage
+    _open(breaker)
+    assert breaker.is_open
+
+    trial = breaker.call().__enter__()
+    assert trial.is_trial
+
+    # The pre-outage call finishing must neither close the circuit nor
+    # release the trial slot
+    stale.__exit__(None, None, None)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.call().__enter__()
+
+    trial.__exit__(None, None, None)
+    assert not breaker.is_open
+
+
+def test_stale_success_does_not_close_and_failed_trial_reopens():
+    breaker = CircuitBreaker("test", fail_max=1, reset_timeout=0)
+
+    stale = breaker.call().__enter__()
+    _open(breaker)
+    stale.__exit__(None, None, None)
+    assert breaker.is_open
+
+    trial = breaker.call().__enter__()
+    assert trial.is_trial
+    error = RuntimeError("still down")
+    trial.__exit__(RuntimeError, error, None)
+    assert breaker.is_open
+
+    # The failed trial freed the slot for the next one
+    with breaker.call() as next_trial:
+        assert next_trial.is_trial
+    assert not breaker.is_open